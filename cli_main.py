@@ -1,19 +1,26 @@
 import argparse
+import contextlib
+import json
 import os
+import sys
 from dotenv import load_dotenv
 
 from core.agent import ResearchBriefingAgent
-from llm.open_source_client import FriendliLLM
-from llm.openai_client import OpenAILLM
+from core.plan_cache import PlanCache
 
 
 def build_llm(provider: str):
     provider = (provider or "").lower().strip()
 
+    # Import only the client that is used: each one-shot CLI run pays the import cost
     if provider == "openai":
+        from llm.openai_client import OpenAILLM
+
         return OpenAILLM(model=os.getenv("OPENAI_MODEL", "gpt-4.1"))
 
     if provider in ("friendli", "oss", "open_source", "opensource"):
+        from llm.open_source_client import FriendliLLM
+
         token = os.getenv("FRIENDLI_TOKEN", "")
         model = os.getenv("FRIENDLI_MODEL", "mistralai/Magistral-Small-2506")
         base_url = os.getenv(
@@ -28,7 +35,7 @@ def main():
     load_dotenv()
 
     parser = argparse.ArgumentParser()
-    parser.add_argument("--instruction", type=str, required=True)
+    parser.add_argument("--instruction", type=str, default="")
     parser.add_argument("--internal_doc", type=str, default="")
     parser.add_argument("--enable_live_web", action="store_true")
     parser.add_argument("--trace_path", type=str, default="runs/run_001.jsonl")
@@ -38,7 +45,15 @@ def main():
         default=os.getenv("LLM_PROVIDER", "openai"),
         help="openai|friendli",
     )
+    parser.add_argument(
+        "--serve",
+        action="store_true",
+        help='read JSONL requests {"instruction": ..., "internal_doc": ..., "trace_path": ...} '
+        "from stdin and write one JSONL result per line, reusing one agent",
+    )
     args = parser.parse_args()
+    if not args.serve and not args.instruction:
+        parser.error("--instruction is required unless --serve is given")
 
     llm = build_llm(args.llm_provider)
 
@@ -54,12 +69,18 @@ def main():
         company_db_path="data/synth_companies.json",
         sensitive_terms=sensitive_terms,
         enable_live_web=args.enable_live_web,
+        plan_cache=PlanCache("runs/plan_cache.json"),
     )
 
+    if args.serve:
+        serve(agent)
+        return
+
     res = agent.run(
         instruction=args.instruction,
         internal_document_text=args.internal_doc,
         trace_path=args.trace_path,
+        return_trace=False,
     )
 
     print("\n===== FINAL DOCUMENT =====\n")
@@ -68,5 +89,37 @@ def main():
         print("\n[Security] Redacted terms:", ", ".join(res.redactions))
 
 
+def serve(agent: ResearchBriefingAgent) -> None:
+    """
+    Long-lived worker: one agent (LLM client, HTTP connection pool, plan cache)
+    serves every request read from stdin.
+    """
+    for line in sys.stdin:
+        line = line.strip()
+        if not line:
+            continue
+
+        try:
+            req = json.loads(line)
+            # Keep stdout for JSONL results only (the agent prints diagnostics)
+            with contextlib.redirect_stdout(sys.stderr):
+                res = agent.run(
+                    instruction=req["instruction"],
+                    internal_document_text=req.get("internal_doc", ""),
+                    trace_path=req.get("trace_path"),
+                    return_trace=False,
+                )
+            out = {
+                "instruction": res.instruction,
+                "final_document": res.final_document,
+                "redactions": res.redactions,
+            }
+        except Exception as e:
+            out = {"error": f"{type(e).__name__}: {e}"}
+
+        sys.stdout.write(json.dumps(out, ensure_ascii=False) + "\n")
+        sys.stdout.flush()
+
+
 if __name__ == "__main__":
     main()
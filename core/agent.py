@@ -1,19 +1,94 @@
-import json
+import importlib
 import os
-from datetime import datetime
-from typing import Any, Dict, Callable, List, Optional
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, BinaryIO, Dict, Callable, List, Optional, Set, Tuple
+
+import orjson
 
 from core.models import AgentPlan, ToolStep, TraceEvent, AgentRunResult
+from core.plan_cache import PlanCache
 from llm.base import BaseLLM
-from tools.company_db import get_company_info
-from tools.web_search import mock_web_search
-from tools.translation import translate_document
-from tools.doc_gen import generate_document
-from tools.security import hybrid_security_filter
-
-
-def _now_iso() -> str:
-    return datetime.utcnow().isoformat() + "Z"
+from llm.cache import LLM_CACHE_DIR, cached_summarize_batch, disk_cached
+from tools.security import compile_sensitive_terms, hybrid_security_filter
+
+
+def _lazy(module: str, name: str) -> Callable[..., Any]:
+    """
+    Import `module.name` on first call instead of at agent import time:
+    web_search pulls in requests/bs4 and doc_gen pulls in jinja2.
+    """
+
+    def call(*args: Any, **kwargs: Any) -> Any:
+        return getattr(importlib.import_module(module), name)(*args, **kwargs)
+
+    call.__name__ = name
+    return call
+
+
+get_company_info = _lazy("tools.company_db", "get_company_info")
+mock_web_search = _lazy("tools.web_search", "mock_web_search")
+translate_document = _lazy("tools.translation", "translate_document")
+generate_document = _lazy("tools.doc_gen", "generate_document")
+
+_cached_translate_document = disk_cached(dir=LLM_CACHE_DIR)(translate_document)
+
+
+# Sent as the system/instructions field: a byte-identical prefix on every
+# planning call lets provider-side prompt caching reuse it.
+PLANNER_INSTRUCTION = (
+    "Plan tool calls for a research assistant that produces a company briefing.\n"
+    "Available tools:\n"
+    "- get_company_info(company_name)\n"
+    "- mock_web_search(company_name)\n"
+    "- translate_document(document, target_language, source, mode)\n"
+    "- generate_document(content_dict)\n"
+    "- security_filter(document)\n\n"
+    "Rules:\n"
+    "1) Always include security_filter as the final step.\n"
+    "2) translate_document may be used for:\n"
+    '   - internal document translation (source="internal", mode="plain")\n'
+    '   - final briefing localization after generate_document (source="final", mode="briefing")\n'
+    "3) generate_document should happen right before either:\n"
+    '   - translate_document(source="final") if target_language is not English, otherwise\n'
+    "   - security_filter\n"
+    "Return a JSON structure matching the schema."
+)
+
+_PUNCT_TABLE = str.maketrans("", "", ",.?!")
+
+_FALLBACK_TARGET_LANGUAGE = "en"
+_FALLBACK_TEMPLATE_STEPS = [
+    ToolStep(tool="get_company_info", args={"company_name": ""}),
+    ToolStep(tool="mock_web_search", args={"company_name": ""}),
+    ToolStep(
+        tool="translate_document",
+        args={
+            "document": "",
+            "target_language": _FALLBACK_TARGET_LANGUAGE,
+            "source": "internal",
+            "mode": "plain",
+        },
+    ),
+    ToolStep(tool="generate_document", args={"content_dict": {}}),
+    ToolStep(
+        tool="translate_document",
+        args={
+            "document": "",
+            "target_language": _FALLBACK_TARGET_LANGUAGE,
+            "source": "final",
+            "mode": "briefing",
+        },
+    ),
+    ToolStep(tool="security_filter", args={"document": ""}),
+]
+
+
+def _now_ms() -> str:
+    # Epoch milliseconds: one C call per event; traces are machine-consumed
+    return str(int(time.time() * 1000))
 
 
 class ResearchBriefingAgent:
@@ -24,12 +99,15 @@ class ResearchBriefingAgent:
         company_db_path: str,
         sensitive_terms: List[str],
         enable_live_web: bool = False,
+        plan_cache: Optional[PlanCache] = None,
     ):
         self.llm = llm
         self.template_path = template_path
         self.company_db_path = company_db_path
         self.sensitive_terms = sensitive_terms
         self.enable_live_web = enable_live_web
+        self.plan_cache = plan_cache
+        self._sensitive_patterns = compile_sensitive_terms(sensitive_terms)
 
         self.tool_registry: Dict[str, Callable[..., Any]] = {
             "get_company_info": lambda **kw: get_company_info(
@@ -38,83 +116,96 @@ class ResearchBriefingAgent:
             "mock_web_search": lambda **kw: mock_web_search(
                 enable_live=self.enable_live_web, **kw
             ),
-            "translate_document": lambda **kw: translate_document(llm=self.llm, **kw),
+            "translate_document": lambda **kw: _cached_translate_document(
+                llm=self.llm, **kw
+            ),
             "generate_document": lambda **kw: generate_document(
                 template_path=self.template_path, **kw
             ),
             "security_filter": lambda **kw: hybrid_security_filter(
                 llm=self.llm,
                 sensitive_terms=self.sensitive_terms,
+                patterns=self._sensitive_patterns,
                 **kw,
             ),
         }
 
+        # Per-tool hooks around each call: pre injects dynamic args from ctx,
+        # post stores the tool output back into ctx
+        self._pre_handlers: Dict[str, Callable[..., Dict[str, Any]]] = {
+            "get_company_info": self._pre_company,
+            "mock_web_search": self._pre_company,
+            "translate_document": self._pre_translate,
+            "generate_document": self._pre_generate,
+            "security_filter": self._pre_security,
+        }
+        self._post_handlers: Dict[str, Callable[..., None]] = {
+            "get_company_info": self._post_company_info,
+            "mock_web_search": self._post_web_search,
+            "translate_document": self._post_translate,
+            "generate_document": self._post_generate,
+            "security_filter": self._post_security,
+        }
+
+        # ctx keys each tool reads/writes; steps without conflicts run concurrently
+        self.tool_io: Dict[str, Tuple[Set[str], Set[str]]] = {
+            "get_company_info": ({"company_name"}, {"company_info"}),
+            "mock_web_search": ({"company_name"}, {"web_findings"}),
+            "translate_document": (
+                {"internal_document_text", "target_language"},
+                {"translated_internal_doc"},
+            ),
+            "translate_document:final": (
+                {"draft_document", "target_language"},
+                {"draft_document"},
+            ),
+            "generate_document": (
+                {
+                    "company_info",
+                    "web_findings",
+                    "translated_internal_doc",
+                    "target_language",
+                },
+                {"draft_document"},
+            ),
+            "security_filter": (
+                {"draft_document", "target_language"},
+                {"draft_document", "final_document", "redactions"},
+            ),
+        }
+
     def _trace(
-        self, trace: List[TraceEvent], event_type: str, payload: Dict[str, Any]
+        self, trace: "_TraceRecorder", event_type: str, payload: Dict[str, Any]
     ) -> None:
+        # Plain dicts: we build the payloads ourselves, so skip pydantic validation
         trace.append(
-            TraceEvent(event_type=event_type, payload={"ts": _now_iso(), **payload})
+            {"event_type": event_type, "payload": {"ts": _now_ms(), **payload}}
         )
 
     def _fallback_plan(self, instruction: str) -> AgentPlan:
-        target_language = "en"
-        tokens = [t.strip(",.?!") for t in instruction.split() if t.strip(",.?!")]
+        tokens = instruction.translate(_PUNCT_TABLE).split()
         company_name = tokens[-1] if tokens else "UnknownCo"
 
-        steps = [
-            ToolStep(tool="get_company_info", args={"company_name": company_name}),
-            ToolStep(tool="mock_web_search", args={"company_name": company_name}),
-            ToolStep(
-                tool="translate_document",
-                args={
-                    "document": "",
-                    "target_language": target_language,
-                    "source": "internal",
-                    "mode": "plain",
-                },
-            ),
-            ToolStep(tool="generate_document", args={"content_dict": {}}),
-            ToolStep(
-                tool="translate_document",
-                args={
-                    "document": "",
-                    "target_language": target_language,
-                    "source": "final",
-                    "mode": "briefing",
-                },
-            ),
-            ToolStep(tool="security_filter", args={"document": ""}),
-        ]
+        steps = [s.model_copy(deep=True) for s in _FALLBACK_TEMPLATE_STEPS]
+        steps[0].args["company_name"] = company_name
+        steps[1].args["company_name"] = company_name
         return AgentPlan(
-            company_name=company_name, target_language=target_language, steps=steps
+            company_name=company_name,
+            target_language=_FALLBACK_TARGET_LANGUAGE,
+            steps=steps,
         )
 
     def plan(self, instruction: str) -> AgentPlan:
-        planner_instruction = (
-            "Plan tool calls for a research assistant that produces a company briefing.\n"
-            "Available tools:\n"
-            "- get_company_info(company_name)\n"
-            "- mock_web_search(company_name)\n"
-            "- translate_document(document, target_language, source, mode)\n"
-            "- generate_document(content_dict)\n"
-            "- security_filter(document)\n\n"
-            "Rules:\n"
-            "1) Always include security_filter as the final step.\n"
-            "2) translate_document may be used for:\n"
-            '   - internal document translation (source="internal", mode="plain")\n'
-            '   - final briefing localization after generate_document (source="final", mode="briefing")\n'
-            "3) generate_document should happen right before either:\n"
-            '   - translate_document(source="final") if target_language is not English, otherwise\n'
-            "   - security_filter\n"
-            "Return a JSON structure matching the schema."
-        )
-
-        full_prompt = f"{planner_instruction}\n\nUser request: {instruction}"
+        if self.plan_cache is not None:
+            cached = self.plan_cache.lookup(instruction)
+            if cached is not None:
+                return cached
 
         try:
             parsed = self.llm.plan(
-                full_prompt,
+                instruction,
                 schema=AgentPlan,
+                system=PLANNER_INSTRUCTION,
             )
 
             plan = AgentPlan(
@@ -130,6 +221,10 @@ class ResearchBriefingAgent:
             print("Traceback:")
             plan = self._fallback_plan(instruction)
 
+        else:
+            if self.plan_cache is not None:
+                self.plan_cache.store(instruction, plan)
+
         return plan
 
     def normalize_plan(self, plan: AgentPlan, internal_document_text: str) -> AgentPlan:
@@ -141,16 +236,13 @@ class ResearchBriefingAgent:
 
         # (B) if internal_doc exist: make sure translate_document(source=internal) before generate_document
         if (internal_document_text or "").strip():
-            gen_idx = next(
-                (i for i, s in enumerate(steps) if s.tool == "generate_document"),
-                None,
-            )
+            idx = _tool_index(steps)
+            gen_idx = idx.get("generate_document", [None])[0]
             trans_idx = next(
                 (
                     i
-                    for i, s in enumerate(steps)
-                    if s.tool == "translate_document"
-                    and (s.args or {}).get("source", "internal") != "final"
+                    for i in idx.get("translate_document", [])
+                    if (steps[i].args or {}).get("source", "internal") != "final"
                 ),
                 None,
             )
@@ -176,20 +268,14 @@ class ResearchBriefingAgent:
         # (C) If target_language != en: ensure translate_document(source=final, mode=briefing)
         tl = (plan.target_language or "en").lower().strip()
         if tl not in ("en", "english"):
+            idx = _tool_index(steps)
             has_final_translate = any(
-                s.tool == "translate_document"
-                and (s.args or {}).get("source") == "final"
-                for s in steps
+                (steps[i].args or {}).get("source") == "final"
+                for i in idx.get("translate_document", [])
             )
             if not has_final_translate:
-                gen_idx = next(
-                    (i for i, s in enumerate(steps) if s.tool == "generate_document"),
-                    None,
-                )
-                sec_idx = next(
-                    (i for i, s in enumerate(steps) if s.tool == "security_filter"),
-                    None,
-                )
+                gen_idx = idx.get("generate_document", [None])[0]
+                sec_idx = idx.get("security_filter", [None])[0]
 
                 insert_at = sec_idx if sec_idx is not None else len(steps)
                 if gen_idx is not None:
@@ -211,133 +297,201 @@ class ResearchBriefingAgent:
         plan.steps = steps
         return plan
 
+    def _pre_company(self, args: Dict[str, Any], ctx: Dict[str, Any]) -> Dict[str, Any]:
+        args.setdefault("company_name", ctx["company_name"])
+        return args
+
+    def _pre_translate(
+        self, args: Dict[str, Any], ctx: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        source = (args.get("source") or "internal").lower().strip()
+        if source == "final":
+            args["document"] = ctx.get("draft_document", "") or ""
+            args.setdefault("mode", "briefing")
+        else:
+            args["document"] = ctx.get("internal_document_text", "") or ""
+            args.setdefault("mode", "plain")
+        args["target_language"] = ctx.get("target_language", "en")
+        args["source"] = source
+        return args
+
+    def _pre_generate(
+        self, args: Dict[str, Any], ctx: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        built_cd = self._build_content_dict(ctx)
+        planned_cd = args.get("content_dict", {}) or {}
+        merged_cd = built_cd | planned_cd
+        merged_cd.setdefault("target_language", ctx.get("target_language", "en"))
+        merged_cd.setdefault("language", ctx.get("target_language", "en"))
+        return {"content_dict": merged_cd}
+
+    def _pre_security(
+        self, args: Dict[str, Any], ctx: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        args["document"] = ctx.get("draft_document", "") or ""
+        args["target_language"] = ctx.get("target_language")
+        return args
+
+    def _post_company_info(
+        self, out: Any, args: Dict[str, Any], ctx: Dict[str, Any]
+    ) -> None:
+        ctx["company_info"] = out
+
+    def _post_web_search(
+        self, out: Any, args: Dict[str, Any], ctx: Dict[str, Any]
+    ) -> None:
+        ctx["web_findings"] = out
+
+    def _post_translate(
+        self, out: Any, args: Dict[str, Any], ctx: Dict[str, Any]
+    ) -> None:
+        if args["source"] == "final":
+            ctx["draft_document"] = out or ""
+        else:
+            ctx["translated_internal_doc"] = out or ""
+
+    def _post_generate(
+        self, out: Any, args: Dict[str, Any], ctx: Dict[str, Any]
+    ) -> None:
+        ctx["draft_document"] = out or ""
+
+    def _post_security(
+        self, out: Any, args: Dict[str, Any], ctx: Dict[str, Any]
+    ) -> None:
+        draft_document, redactions = out
+        ctx["draft_document"] = draft_document
+        ctx["final_document"] = draft_document
+        ctx["redactions"] = redactions
+
+    def _step_io(self, step: ToolStep) -> Tuple[Set[str], Set[str]]:
+        key = step.tool
+        if key == "translate_document":
+            source = ((step.args or {}).get("source") or "internal").lower().strip()
+            if source == "final":
+                key = "translate_document:final"
+        return self.tool_io.get(key, (set(), set()))
+
+    def _step_levels(self, steps: List[ToolStep]) -> List[List[int]]:
+        """
+        Group step indices into dependency levels: a step lands one level after
+        the latest earlier step it conflicts with (read-after-write,
+        write-after-read or write-after-write on ctx keys).
+        """
+        ios = [self._step_io(s) for s in steps]
+        step_level: List[int] = []
+        for i, (reads, writes) in enumerate(ios):
+            level = 0
+            for j in range(i):
+                prev_reads, prev_writes = ios[j]
+                if prev_writes & reads or prev_writes & writes or prev_reads & writes:
+                    level = max(level, step_level[j] + 1)
+            step_level.append(level)
+
+        levels: List[List[int]] = [[] for _ in range(max(step_level, default=-1) + 1)]
+        for i, level in enumerate(step_level):
+            levels[level].append(i)
+        return levels
+
     def run(
         self,
         instruction: str,
         internal_document_text: str = "",
         trace_path: Optional[str] = None,
+        return_trace: bool = True,
     ) -> AgentRunResult:
-        trace: List[TraceEvent] = []
-        self._trace(trace, "start", {"instruction": instruction})
-
-        plan = self.plan(instruction)
-        self._trace(trace, "raw_plan", {"plan": plan.model_dump()})
-
-        plan = self.normalize_plan(plan, internal_document_text)
-        self._trace(trace, "plan", {"plan": plan.model_dump()})
-
-        ctx: Dict[str, Any] = {
-            "company_name": plan.company_name,
-            "target_language": plan.target_language,
-            "internal_document_text": internal_document_text,
-            "translated_internal_doc": "",
-        }
-
-        draft_document = ""
-        redactions: List[str] = []
-
-        for idx, step in enumerate(plan.steps):
-            tool_name = step.tool
-            tool = self.tool_registry.get(tool_name)
-
-            if tool is None:
-                self._trace(
-                    trace,
-                    "tool_error",
-                    {"step": idx, "tool": tool_name, "error": "Tool not found"},
-                )
-                continue
-
-            args = dict(step.args or {})
-
-            # Inject dynamic args
-            if tool_name == "get_company_info":
-                args.setdefault("company_name", ctx["company_name"])
-
-            elif tool_name == "mock_web_search":
-                args.setdefault("company_name", ctx["company_name"])
-
-            elif tool_name == "translate_document":
-                source = (args.get("source") or "internal").lower().strip()
-                if source == "final":
-                    args["document"] = draft_document or ""
-                    args.setdefault("mode", "briefing")
-                else:
-                    args["document"] = ctx.get("internal_document_text", "") or ""
-                    args.setdefault("mode", "plain")
-                args["target_language"] = ctx.get("target_language", "en")
-                args["source"] = source
-
-            elif tool_name == "generate_document":
-                built_cd = self._build_content_dict(ctx)
-                planned_cd = args.get("content_dict", {}) or {}
-                merged_cd = built_cd | planned_cd
-                merged_cd.setdefault(
-                    "target_language", ctx.get("target_language", "en")
-                )
-                merged_cd.setdefault("language", ctx.get("target_language", "en"))
-                args = {"content_dict": merged_cd}
-
-            elif tool_name == "security_filter":
-                args["document"] = draft_document or ""
-
+        trace = _TraceRecorder(trace_path, keep_events=return_trace)
+        try:
+            self._trace(trace, "start", {"instruction": instruction})
+
+            plan = self.plan(instruction)
+            self._trace(trace, "raw_plan", _plan_payload(plan))
+
+            plan = self.normalize_plan(plan, internal_document_text)
+            self._trace(trace, "plan", _plan_payload(plan))
+
+            ctx: Dict[str, Any] = {
+                "company_name": plan.company_name,
+                "target_language": plan.target_language,
+                "internal_document_text": internal_document_text,
+                "translated_internal_doc": "",
+                "draft_document": "",
+                "redactions": [],
+            }
+
+            with ThreadPoolExecutor(max_workers=4) as pool:
+                for level in self._step_levels(plan.steps):
+                    calls = []
+                    for idx in level:
+                        tool_name = plan.steps[idx].tool
+                        tool = self.tool_registry.get(tool_name)
+
+                        if tool is None:
+                            self._trace(
+                                trace,
+                                "tool_error",
+                                {
+                                    "step": idx,
+                                    "tool": tool_name,
+                                    "error": "Tool not found",
+                                },
+                            )
+                            continue
+
+                        args = dict(plan.steps[idx].args or {})
+                        args = self._pre_handlers.get(tool_name, _noop_pre)(args, ctx)
+
+                        self._trace(
+                            trace,
+                            "tool_call",
+                            {"step": idx, "tool": tool_name, "args": args},
+                        )
+                        calls.append((idx, tool_name, tool, args))
+
+                    # Steps within a level are independent (I/O-bound tools / LLM calls)
+                    results = list(pool.map(lambda c: _invoke(c[2], c[3]), calls))
+
+                    for (idx, tool_name, _, args), (out, err) in zip(calls, results):
+                        if err is not None:
+                            self._trace(
+                                trace,
+                                "tool_error",
+                                {"step": idx, "tool": tool_name, "error": str(err)},
+                            )
+                            continue
+
+                        self._trace(
+                            trace,
+                            "tool_result",
+                            {
+                                "step": idx,
+                                "tool": tool_name,
+                                "output_preview": _preview(out),
+                            },
+                        )
+
+                        try:
+                            self._post_handlers.get(tool_name, _noop_post)(
+                                out, args, ctx
+                            )
+                        except Exception as e:
+                            self._trace(
+                                trace,
+                                "tool_error",
+                                {"step": idx, "tool": tool_name, "error": str(e)},
+                            )
+
+            final_doc = ctx.get("final_document", ctx["draft_document"])
+            redactions = ctx["redactions"]
             self._trace(
-                trace, "tool_call", {"step": idx, "tool": tool_name, "args": args}
+                trace, "end", {"redactions": redactions, "final_len": len(final_doc)}
             )
-
-            try:
-                out = tool(**args)
-                self._trace(
-                    trace,
-                    "tool_result",
-                    {"step": idx, "tool": tool_name, "output_preview": _preview(out)},
-                )
-
-                if tool_name == "get_company_info":
-                    ctx["company_info"] = out
-
-                elif tool_name == "mock_web_search":
-                    ctx["web_findings"] = out
-
-                elif tool_name == "translate_document":
-                    source = (args.get("source") or "internal").lower().strip()
-                    if source == "final":
-                        draft_document = out or ""
-                        ctx["draft_document"] = draft_document
-                    else:
-                        ctx["translated_internal_doc"] = out or ""
-
-                elif tool_name == "generate_document":
-                    draft_document = out or ""
-                    ctx["draft_document"] = draft_document
-
-                elif tool_name == "security_filter":
-                    draft_document, redactions = out
-                    ctx["final_document"] = draft_document
-                    ctx["redactions"] = redactions
-
-            except Exception as e:
-                self._trace(
-                    trace,
-                    "tool_error",
-                    {"step": idx, "tool": tool_name, "error": str(e)},
-                )
-
-        final_doc = ctx.get("final_document", draft_document)
-        self._trace(
-            trace, "end", {"redactions": redactions, "final_len": len(final_doc)}
-        )
-
-        if trace_path:
-            os.makedirs(os.path.dirname(trace_path), exist_ok=True)
-            with open(trace_path, "w", encoding="utf-8") as f:
-                for ev in trace:
-                    f.write(json.dumps(ev.model_dump(), ensure_ascii=False) + "\n")
+        finally:
+            trace.close()
 
         return AgentRunResult(
             instruction=instruction,
             plan=plan,
-            trace=trace,
+            trace=[TraceEvent.model_construct(**ev) for ev in trace.events],
             final_document=final_doc,
             redactions=redactions,
         )
@@ -347,20 +501,25 @@ class ResearchBriefingAgent:
         web = ctx.get("web_findings", {}) or {}
 
         internal_doc = ctx.get("translated_internal_doc", "") or ""
-        if internal_doc:
-            internal_summary = self.llm.summarize(
-                internal_doc, ctx["target_language"], max_words=160
-            )
-        else:
-            internal_summary = "(No internal document provided.)"
-
         web_text = web.get("combined_text", "") or ""
-        if web_text:
-            web_summary = self.llm.summarize(
-                web_text, ctx["target_language"], max_words=160
+
+        # One summarize_batch round-trip for all non-empty sources
+        sources = {"internal": internal_doc, "web": web_text}
+        to_summarize = {k: v for k, v in sources.items() if v}
+        summaries = dict(
+            zip(
+                to_summarize,
+                cached_summarize_batch(
+                    self.llm,
+                    list(to_summarize.values()),
+                    ctx["target_language"],
+                    max_words=160,
+                ),
             )
-        else:
-            web_summary = "(No web findings.)"
+        )
+
+        internal_summary = summaries.get("internal", "(No internal document provided.)")
+        web_summary = summaries.get("web", "(No web findings.)")
 
         return {
             "company_name": ctx.get("company_name", "UnknownCo"),
@@ -375,6 +534,99 @@ class ResearchBriefingAgent:
         }
 
 
+class _TraceRecorder:
+    """
+    Collects trace events for a run.
+    - If a path is given, events are serialized on append and written to the
+      JSONL file by a background thread, off the agent's critical path.
+    - Events are kept in memory only when keep_events=True.
+    """
+
+    def __init__(self, path: Optional[str], keep_events: bool = True):
+        self.events: List[Dict[str, Any]] = []
+        self.keep_events = keep_events
+        self._queue: "queue.Queue[Optional[bytes]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+
+        if path:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            f = open(path, "wb")
+            self._thread = threading.Thread(target=self._drain, args=(f,), daemon=True)
+            self._thread.start()
+
+    def append(self, ev: Dict[str, Any]) -> None:
+        if self.keep_events:
+            self.events.append(ev)
+        if self._thread is not None:
+            self._queue.put(
+                orjson.dumps(
+                    ev,
+                    option=orjson.OPT_APPEND_NEWLINE | orjson.OPT_NON_STR_KEYS,
+                )
+            )
+
+    def _drain(self, f: BinaryIO) -> None:
+        with f:
+            done = False
+            while not done:
+                # Take everything already queued: one write per batch, not per event
+                batch = [self._queue.get()]
+                while True:
+                    try:
+                        batch.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+                if batch[-1] is None:
+                    done = True
+                    batch.pop()
+                f.write(b"".join(batch))
+
+    def close(self, timeout: float = 10.0) -> None:
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join(timeout=timeout)
+            self._thread = None
+
+
+def _plan_payload(plan: AgentPlan) -> Dict[str, Any]:
+    """
+    Plan summary for trace events; the full plan dump (step args can embed
+    whole documents) only when TRACE_VERBOSE is set.
+    """
+    if os.getenv("TRACE_VERBOSE", "0").strip().lower() in ("1", "true", "yes"):
+        return {"plan": plan.model_dump()}
+    return {
+        "company_name": plan.company_name,
+        "target_language": plan.target_language,
+        "step_tools": [s.tool for s in plan.steps],
+    }
+
+
+def _tool_index(steps: List[ToolStep]) -> Dict[str, List[int]]:
+    """Map tool name -> indices of its steps, in order (one pass over steps)."""
+    idx: Dict[str, List[int]] = {}
+    for i, s in enumerate(steps):
+        idx.setdefault(s.tool, []).append(i)
+    return idx
+
+
+def _noop_pre(args: Dict[str, Any], ctx: Dict[str, Any]) -> Dict[str, Any]:
+    return args
+
+
+def _noop_post(out: Any, args: Dict[str, Any], ctx: Dict[str, Any]) -> None:
+    return None
+
+
+def _invoke(
+    tool: Callable[..., Any], args: Dict[str, Any]
+) -> Tuple[Any, Optional[Exception]]:
+    try:
+        return tool(**args), None
+    except Exception as e:
+        return None, e
+
+
 def _preview(x: Any, n: int = 400) -> str:
     s = str(x)
     return s if len(s) <= n else s[:n] + "..."
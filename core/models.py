@@ -29,6 +29,10 @@ class RedactionResult(BaseModel):
     matched_terms: List[str] = []
 
 
+class SummaryBatch(BaseModel):
+    summaries: List[str]
+
+
 class ToolResult(BaseModel):
     tool: str
     success: bool
@@ -0,0 +1,156 @@
+import json
+import os
+import re
+import tempfile
+from typing import Any, Dict, List, Optional
+
+from core.models import AgentPlan
+
+COMPANY_PLACEHOLDER = "{company_name}"
+
+# Bumped when the pattern format changes; entries from older versions are ignored
+CACHE_VERSION = 3
+
+
+def _normalize(instruction: str) -> str:
+    return " ".join((instruction or "").split())
+
+
+def _replace_company(obj: Any, old: str, new: str) -> Any:
+    """
+    Replace `company_name` values (plan field and step args) equal to `old`;
+    other strings are left alone, even if they contain `old`.
+    """
+    if isinstance(obj, list):
+        return [_replace_company(x, old, new) for x in obj]
+    if isinstance(obj, dict):
+        return {
+            k: (
+                new
+                if k == "company_name"
+                and isinstance(v, str)
+                and v.strip().casefold() == old.casefold()
+                else _replace_company(v, old, new)
+            )
+            for k, v in obj.items()
+        }
+    return obj
+
+
+def _mentions(obj: Any, name: str) -> bool:
+    """True if any string in obj contains `name` (case-insensitive)."""
+    if isinstance(obj, str):
+        return name.casefold() in obj.casefold()
+    if isinstance(obj, list):
+        return any(_mentions(x, name) for x in obj)
+    if isinstance(obj, dict):
+        return any(_mentions(v, name) for v in obj.values())
+    return False
+
+
+class PlanCache:
+    """
+    Plan cache keyed by instruction template.
+    - The company name in the instruction is replaced by a placeholder,
+      so "briefing on Tesla in German" and "briefing on OpenAI in German"
+      share one cached plan.
+    - On hit, the cached plan is re-parameterized with the new company name
+      and the planner LLM call is skipped.
+    - The company slot matches exactly as many words as the stored company
+      name, so everything else in the instruction (e.g. "in German") must
+      match literally: "briefing on Tesla" never matches "briefing on Tesla in
+      German", and the target language is effectively part of the key.
+    - The name is located as a whole word, and only `company_name` fields are
+      templated; plans mentioning it in any other arg are not cached.
+    - Entries are persisted as JSON so they survive across runs; a missing or
+      corrupt file is treated as an empty cache.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self.entries: List[Dict[str, Any]] = []
+        self._patterns: List[re.Pattern] = []
+
+        if path and os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    loaded = json.load(f)
+            except (OSError, ValueError):
+                loaded = []
+            for entry in loaded if isinstance(loaded, list) else []:
+                try:
+                    if entry.get("version") == CACHE_VERSION:
+                        self._add(entry)
+                except (AttributeError, KeyError, re.error):
+                    continue
+
+    def _add(self, entry: Dict[str, Any]) -> None:
+        pattern = re.compile(entry["pattern"], flags=re.IGNORECASE)
+        self.entries.append(entry)
+        self._patterns.append(pattern)
+
+    def lookup(self, instruction: str) -> Optional[AgentPlan]:
+        text = _normalize(instruction)
+        for pattern, entry in zip(self._patterns, self.entries):
+            m = pattern.fullmatch(text)
+            if not m:
+                continue
+            company_name = m.group("company").strip()
+            if not company_name:
+                continue
+            plan = _replace_company(entry["plan"], COMPANY_PLACEHOLDER, company_name)
+            return AgentPlan.model_validate(plan)
+        return None
+
+    def store(self, instruction: str, plan: AgentPlan) -> None:
+        company_name = (plan.company_name or "").strip()
+        text = _normalize(instruction)
+        # Whole-word match only: "Meta" must not be found inside "metadata"
+        m = (
+            re.search(
+                r"(?<!\w)" + re.escape(company_name) + r"(?!\w)",
+                text,
+                flags=re.IGNORECASE,
+            )
+            if company_name
+            else None
+        )
+        if m is None:
+            # Company name not literally in the instruction: no safe template
+            return
+
+        template = _replace_company(
+            plan.model_dump(), company_name, COMPANY_PLACEHOLDER
+        )
+        if _mentions(template, company_name):
+            # Name also appears in other args (e.g. "Tesla AI Day"): those can't
+            # be re-parameterized safely, so don't cache this plan
+            return
+
+        start, end = m.span()
+        # Same word count as the stored name: the slot can't absorb extra words
+        n_words = len(text[start:end].split())
+        company_slot = r"(?P<company>\S+" + r"(?: \S+)" * (n_words - 1) + ")"
+        pattern = re.escape(text[:start]) + company_slot + re.escape(text[end:])
+        if any(e["pattern"] == pattern for e in self.entries):
+            return
+
+        self._add({"version": CACHE_VERSION, "pattern": pattern, "plan": template})
+        self._save()
+
+    def _save(self) -> None:
+        if not self.path:
+            return
+        directory = os.path.dirname(self.path) or "."
+        os.makedirs(directory, exist_ok=True)
+        # Write-then-rename so an interrupted write never leaves a truncated file
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(self.entries, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.path)
+        except OSError:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
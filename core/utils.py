@@ -0,0 +1,22 @@
+import re
+from typing import Hashable, Iterable, List, TypeVar
+
+H = TypeVar("H", bound=Hashable)
+
+_BLANK_LINE_RUNS = re.compile(r"\n(?:[ \t]*\n)+")
+
+
+def dedup_preserve(items: Iterable[H]) -> List[H]:
+    """
+    Deduplicate while preserving first-seen order.
+    """
+    return list(dict.fromkeys(items))
+
+
+def compact_blank_lines(text: str) -> str:
+    """
+    Collapse each run of blank / whitespace-only lines into one empty line and
+    strip the ends. Markdown renders the same (a blank line is a blank line);
+    used to cut tokens before LLM passes that echo the text back.
+    """
+    return _BLANK_LINE_RUNS.sub("\n\n", text).strip()
@@ -3,7 +3,7 @@ import os
 from typing import Literal
 from dotenv import load_dotenv
 from openai import OpenAI
-from pydantic import BaseModel, Field, HttpUrl
+from pydantic import BaseModel, Field, HttpUrl, model_validator
 
 load_dotenv()
 
@@ -19,10 +19,6 @@ class Company(BaseModel):
     sensitive_projects: list[str]
 
 
-class CompaniesFile(BaseModel):
-    companies: list[Company] = Field(min_length=10, max_length=10)
-
-
 class InternalDoc(BaseModel):
     id: str
     title: str
@@ -31,16 +27,28 @@ class InternalDoc(BaseModel):
     text: str
 
 
-class InternalDocsFile(BaseModel):
+class Bundle(BaseModel):
+    companies: list[Company] = Field(min_length=10, max_length=10)
     documents: list[InternalDoc] = Field(min_length=10, max_length=10)
 
+    @model_validator(mode="after")
+    def _one_doc_per_company(self) -> "Bundle":
+        company_names = sorted(c.name for c in self.companies)
+        doc_companies = sorted(d.company for d in self.documents)
+        if company_names != doc_companies:
+            raise ValueError(
+                "Each document 'company' must match exactly one company 'name'"
+            )
+        return self
+
 
 client = OpenAI(api_key=os.environ.get("OPENAI_API_KEY"))
 
-companies_prompt = """
-Generate exactly 10 synthetic company records as JSON that matches the provided schema.
+bundle_prompt = """
+Generate a synthetic dataset as JSON that matches the provided schema:
+exactly 10 company records and exactly 10 internal document records, one per company.
 
-Style constraints:
+Company style constraints:
 - Realistic corporate tone.
 - Mix well-known real companies and plausible fictional ones.
 - "headquarters" must be a single string like "City, ST" or "City, Country".
@@ -51,31 +59,7 @@ Style constraints:
 - "sensitive_projects" is a list of 0-2 internal codenames. Use an empty list if none.
 - Keep fields concise and consistent.
 
-Output only JSON that conforms to the schema.
-""".strip()
-
-companies_resp = client.responses.parse(
-    model="gpt-4o",
-    input=[
-        {
-            "role": "system",
-            "content": "You generate structured synthetic datasets that strictly follow a schema.",
-        },
-        {"role": "user", "content": companies_prompt},
-    ],
-    text_format=CompaniesFile,
-)
-
-companies_obj = companies_resp.output_parsed
-companies_list = [c.model_dump() for c in companies_obj.companies]
-
-with open("synth_companies.json", "w", encoding="utf-8") as f:
-    json.dump(companies_list, f, ensure_ascii=False, indent=2)
-
-docs_prompt = f"""
-You will be given a list of companies as JSON. Create exactly 10 internal document records, one per company, matching the schema.
-
-Hard constraints:
+Document hard constraints:
 - "company" must match the company "name" EXACTLY.
 - "id" must be unique, lowercase snake_case, and include a company hint (e.g., "acme_q2_internal").
 - "title" must end with ".pdf" and look like an internal file name (e.g., "Acme_Internal_Strategy.pdf").
@@ -85,26 +69,29 @@ Hard constraints:
 - If the company has any "sensitive_projects", reference at least one by name in the text and include a non-disclosure instruction.
 - If the company has no "sensitive_projects" and is "low" risk, avoid referencing restricted initiatives.
 
-Companies JSON:
-{json.dumps(companies_list, ensure_ascii=False, indent=2)}
-
 Output only JSON that conforms to the schema.
 """.strip()
 
-docs_resp = client.responses.parse(
+# One structured request for both files (documents depend on the companies,
+# so the model generates them together instead of in a second round-trip)
+bundle_resp = client.responses.parse(
     model="gpt-4o",
     input=[
         {
             "role": "system",
-            "content": "You generate structured internal-style documents that strictly follow a schema.",
+            "content": "You generate structured synthetic datasets and internal-style documents that strictly follow a schema.",
         },
-        {"role": "user", "content": docs_prompt},
+        {"role": "user", "content": bundle_prompt},
     ],
-    text_format=InternalDocsFile,
+    text_format=Bundle,
 )
 
-docs_obj = docs_resp.output_parsed
-docs_list = [d.model_dump() for d in docs_obj.documents]
+bundle_obj = bundle_resp.output_parsed
+companies_list = [c.model_dump() for c in bundle_obj.companies]
+docs_list = [d.model_dump() for d in bundle_obj.documents]
+
+with open("synth_companies.json", "w", encoding="utf-8") as f:
+    json.dump(companies_list, f, ensure_ascii=False, indent=2)
 
 with open("internal_docs.json", "w", encoding="utf-8") as f:
     json.dump(docs_list, f, ensure_ascii=False, indent=2)
@@ -1,9 +1,24 @@
 from __future__ import annotations
+import os
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
 from typing import Type, TypeVar, List, Optional, Tuple
 
+from core.models import SummaryBatch
+from llm.json_fix import plan_with_json_retries
+
 T = TypeVar("T")
 
+# Upper bound on concurrent round-trips fanned out from a single call
+MAX_PARALLEL_CALLS = 8
+
+# Max items marshaled into one batched prompt (returns diminish beyond ~16)
+LLM_BATCH_SIZE = max(1, int(os.getenv("LLM_BATCH_SIZE", "8")))
+
+
+def split_batches(items: List[str], size: int = LLM_BATCH_SIZE) -> List[List[str]]:
+    return [items[i : i + size] for i in range(0, len(items), size)]
+
 
 class BaseLLM(ABC):
     """
@@ -12,7 +27,13 @@ class BaseLLM(ABC):
     """
 
     @abstractmethod
-    def plan(self, instruction: str, schema: Type[T]) -> T:
+    def plan(
+        self, instruction: str, schema: Type[T], *, system: Optional[str] = None
+    ) -> T:
+        """
+        `system` carries static planner instructions; it is sent separately from
+        the per-request `instruction` so the prompt prefix stays identical.
+        """
         raise NotImplementedError
 
     @abstractmethod
@@ -27,6 +48,121 @@ class BaseLLM(ABC):
     def summarize(self, text: str, target_language: str, max_words: int = 180) -> str:
         raise NotImplementedError
 
+    def summarize_instructions(
+        self, target_language: str, max_words: int = 180, *, batch: bool = False
+    ) -> str:
+        """
+        Instructions for summarize() (batch=False) or the batched
+        summarize_batch() request (batch=True). Part of the summary cache key,
+        so prompt edits invalidate it.
+        """
+        if batch:
+            return (
+                "You are a precise analyst. Summarize each text below separately for a company briefing. "
+                f"Write every summary in {target_language}. "
+                f"Keep each summary under {max_words} words. "
+                'Return ONLY valid JSON: {"summaries": ["...", ...]} with one summary per text, in order.'
+            )
+        return (
+            "You are a precise analyst. Summarize the text for a company briefing. "
+            f"Write the summary in {target_language}. "
+            f"Keep it under {max_words} words. Return only the summary."
+        )
+
+    def _json_call(self, instructions: str, input_text: str, *, max_tokens: int) -> str:
+        """
+        One JSON-mode round-trip returning the raw model output; the hook behind
+        the batched summarize_batch(). Clients without it get per-text calls.
+        """
+        raise NotImplementedError
+
+    def summarize_batch(
+        self, texts: List[str], target_language: str, max_words: int = 180
+    ) -> List[str]:
+        """
+        Summarize several independent texts. Returns one summary per text, in order.
+        - Clients implementing _json_call(): one SummaryBatch request per
+          LLM_BATCH_SIZE texts, marked with <<<DOC_n>>>; several chunks are
+          sent concurrently
+        - Otherwise, or when the batch output is unusable (not parseable, wrong
+          count): one summarize() call per text, issued concurrently
+        Only summaries are batched: a run translates one document and redacts
+        one document (a miss must not leak through a shared response), so there
+        is no multi-text caller for a translate or redact batch.
+        """
+        if len(texts) <= 1 or type(self)._json_call is BaseLLM._json_call:
+            return self._summarize_each(texts, target_language, max_words)
+        if len(texts) > LLM_BATCH_SIZE:
+            # Chunks are independent batched round-trips: issue them concurrently
+            batches = split_batches(texts)
+            with ThreadPoolExecutor(
+                max_workers=min(len(batches), MAX_PARALLEL_CALLS)
+            ) as pool:
+                return [
+                    s
+                    for summaries in pool.map(
+                        lambda batch: self.summarize_batch(
+                            batch, target_language, max_words
+                        ),
+                        batches,
+                    )
+                    for s in summaries
+                ]
+
+        instr = self.summarize_instructions(target_language, max_words, batch=True)
+        docs = "\n\n".join(
+            f"<<<DOC_{i}>>>\n{text}" for i, text in enumerate(texts, start=1)
+        )
+
+        try:
+            result = plan_with_json_retries(
+                instruction=docs,
+                schema=SummaryBatch,
+                generate_text=lambda prompt: self._json_call(
+                    instr, prompt, max_tokens=512 * len(texts)
+                ),
+                retries=1,
+                debug=getattr(self, "debug_plan", False),
+                debug_prefix=f"SUMMARIZE/{type(self).__name__}",
+            )
+        except RuntimeError:
+            return self._summarize_each(texts, target_language, max_words)
+        if len(result.summaries) != len(texts):
+            return self._summarize_each(texts, target_language, max_words)
+        return result.summaries
+
+    def _summarize_each(
+        self, texts: List[str], target_language: str, max_words: int
+    ) -> List[str]:
+        # Independent network round-trips: issue them concurrently
+        if len(texts) <= 1:
+            return [
+                self.summarize(t, target_language, max_words=max_words) for t in texts
+            ]
+
+        with ThreadPoolExecutor(
+            max_workers=min(len(texts), MAX_PARALLEL_CALLS)
+        ) as pool:
+            return list(
+                pool.map(
+                    lambda t: self.summarize(t, target_language, max_words=max_words),
+                    texts,
+                )
+            )
+
+    def redact_instructions(
+        self,
+        sensitive_terms: List[str],
+        *,
+        target_language: Optional[str] = None,
+        replacement: str = "[REDACTED]",
+    ) -> str:
+        """
+        Instructions redact() sends for these arguments ("" if the client has
+        none). Part of the redaction cache key, so prompt edits invalidate it.
+        """
+        return ""
+
     @abstractmethod
     def redact(
         self,
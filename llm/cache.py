@@ -0,0 +1,242 @@
+from __future__ import annotations
+import functools
+import hashlib
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Protocol, TypeVar
+
+import orjson
+
+from llm.base import BaseLLM
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+LLM_CACHE_DIR = "runs/llm_cache"
+
+
+def cache_key(*parts: Any) -> str:
+    return hashlib.sha256("|".join(str(p) for p in parts).encode("utf-8")).hexdigest()
+
+
+class CacheBackend(Protocol):
+    def get(self, key: str) -> Optional[Any]: ...
+
+    def set(self, key: str, value: Any) -> None: ...
+
+
+class DiskCache:
+    """
+    SHA256-keyed on-disk cache.
+    Entries are JSON files sharded by the first two hex chars of the key.
+    Best-effort: I/O errors read as a miss and drop the write.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def get(self, key: str) -> Optional[Any]:
+        try:
+            with open(self._path(key), "rb") as f:
+                return orjson.loads(f.read())
+        except (OSError, orjson.JSONDecodeError):
+            return None
+
+    def set(self, key: str, value: Any) -> None:
+        path = self._path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Unique temp file per writer, so concurrent threads never share one
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        except OSError:
+            return
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(orjson.dumps(value))
+            os.replace(tmp_path, path)
+        except OSError:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+
+class MemoryLRU:
+    """
+    Thread-safe in-process LRU cache.
+    """
+
+    def __init__(self, maxsize: int = 2048):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            if key not in self._data:
+                return None
+            self._data.move_to_end(key)
+            return self._data[key]
+
+    def set(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+
+class ResponseCache:
+    """
+    Cache for deterministic (temperature=0) LLM responses.
+    - In-process LRU in front of a persistent backend (DiskCache by default)
+    - Keyed by sha256 over the full request (model, instructions, input, params)
+    - Opt-in: enabled when LLM_CACHE=1
+    - stats: {"hits": ..., "misses": ...}
+    """
+
+    def __init__(
+        self,
+        backend: Optional[CacheBackend] = None,
+        maxsize: int = 2048,
+        enabled: Optional[bool] = None,
+    ):
+        if enabled is None:
+            enabled = os.getenv("LLM_CACHE", "0").strip().lower() in (
+                "1",
+                "true",
+                "yes",
+            )
+        self.enabled = enabled
+        self.memory = MemoryLRU(maxsize)
+        self.backend = backend or DiskCache(os.path.join(LLM_CACHE_DIR, "responses"))
+        self.stats: Dict[str, int] = {"hits": 0, "misses": 0}
+
+    def get_or_call(self, request: Dict[str, Any], call: Callable[[], str]) -> str:
+        if not self.enabled:
+            return call()
+
+        key = hashlib.sha256(
+            orjson.dumps(request, option=orjson.OPT_SORT_KEYS, default=str)
+        ).hexdigest()
+
+        hit = self.memory.get(key)
+        if hit is None:
+            hit = self.backend.get(key)
+            if hit is not None:
+                self.memory.set(key, hit)
+        if hit is not None:
+            self.stats["hits"] += 1
+            return hit
+
+        self.stats["misses"] += 1
+        out = call()
+        if out:
+            self.memory.set(key, out)
+            self.backend.set(key, out)
+        return out
+
+
+RESPONSE_CACHE = ResponseCache()
+
+
+def _llm_id(llm: BaseLLM) -> str:
+    return f"{type(llm).__name__}:{getattr(llm, 'model', '')}"
+
+
+def disk_cached(dir: str = LLM_CACHE_DIR) -> Callable[[F], F]:
+    """
+    Cache an LLM-backed function on disk.
+    The key covers the function name, the LLM client/model and all other
+    arguments; the LLM instance itself is not part of the key.
+    - Opt-in like RESPONSE_CACHE (LLM_CACHE=1); otherwise fn is called directly
+    - Best-effort: cache read/write errors fall through to an uncached call
+    - Empty outputs are not cached
+    """
+    cache = DiskCache(dir)
+
+    def decorator(fn: F) -> F:
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if not RESPONSE_CACHE.enabled:
+                return fn(*args, **kwargs)
+
+            llm = kwargs.get("llm")
+            if llm is None:
+                llm = next((a for a in args if isinstance(a, BaseLLM)), None)
+
+            key = cache_key(
+                fn.__name__,
+                _llm_id(llm),
+                *(a for a in args if a is not llm),
+                *(f"{k}={kwargs[k]}" for k in sorted(kwargs) if k != "llm"),
+            )
+            try:
+                hit = cache.get(key)
+            except (OSError, ValueError):
+                hit = None
+            if hit is not None:
+                return hit
+
+            out = fn(*args, **kwargs)
+            if out:
+                try:
+                    cache.set(key, out)
+                except OSError:
+                    pass
+            return out
+
+        wrapper.cache = cache  # type: ignore[attr-defined]
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
+
+
+_SUMMARY_CACHE = DiskCache(LLM_CACHE_DIR)
+
+
+def cached_summarize_batch(
+    llm: BaseLLM, texts: List[str], target_language: str, max_words: int = 180
+) -> List[str]:
+    """
+    llm.summarize_batch() with a per-text disk cache.
+    - Opt-in like RESPONSE_CACHE (LLM_CACHE=1); otherwise a plain summarize_batch()
+    - Keyed by client/model, text, language, word limit and a fingerprint of the
+      summarize instructions
+    - Only texts without a cached summary are sent to the LLM
+    """
+    if not RESPONSE_CACHE.enabled:
+        return llm.summarize_batch(texts, target_language, max_words=max_words)
+
+    prompt_fingerprint = cache_key(
+        llm.summarize_instructions(target_language, max_words),
+        llm.summarize_instructions(target_language, max_words, batch=True),
+    )
+    keys = [
+        cache_key(
+            "summarize",
+            _llm_id(llm),
+            text,
+            target_language,
+            max_words,
+            prompt_fingerprint,
+        )
+        for text in texts
+    ]
+    out: List[Optional[str]] = [_SUMMARY_CACHE.get(k) for k in keys]
+
+    missing = [i for i, s in enumerate(out) if s is None]
+    if missing:
+        fresh = llm.summarize_batch(
+            [texts[i] for i in missing], target_language, max_words=max_words
+        )
+        for i, summary in zip(missing, fresh):
+            out[i] = summary
+            if summary:
+                _SUMMARY_CACHE.set(keys[i], summary)
+
+    return [s or "" for s in out]
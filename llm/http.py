@@ -0,0 +1,23 @@
+from __future__ import annotations
+import functools
+
+import httpx
+
+
+@functools.lru_cache(maxsize=None)
+def shared_http_client() -> httpx.Client:
+    """
+    Process-wide HTTP client shared by every OpenAI-compatible LLM client.
+    Connections (and their TLS sessions) are kept alive and reused across
+    client instances and agent runs instead of each OpenAI() opening its own pool.
+    """
+    return httpx.Client(
+        limits=httpx.Limits(
+            max_connections=64,
+            max_keepalive_connections=32,
+            keepalive_expiry=60,
+        ),
+        # The OpenAI SDK uses this as its per-request timeout: keep its 600s
+        # default for reads (reasoning models often take minutes), fail fast on connect
+        timeout=httpx.Timeout(600.0, connect=10.0),
+    )
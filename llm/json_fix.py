@@ -1,35 +1,45 @@
 from __future__ import annotations
+import functools
 import json
-from typing import Any, Callable, Type, TypeVar
+from typing import Any, Callable, Iterable, Type, TypeVar
 
-from pydantic import ValidationError
+import orjson
+from pydantic import TypeAdapter, ValidationError
 
 T = TypeVar("T")
 
+_DECODER = json.JSONDecoder()
+
+# One validator per schema, reused across plan attempts
+_ADAPTERS: dict[type, TypeAdapter] = {}
+
 
 def strip_markdown_fences(text: str) -> str:
     """
     If text is wrapped in ```...``` fences (optionally ```json),
     remove the fences and return the inner content.
     """
-    t = (text or "").strip()
-    if not t.startswith("```"):
-        return t
+    if not text:
+        return ""
+    # Cheap check on a small prefix before copying/splitting the whole text
+    if "```" not in text[:16]:
+        return text.strip()
 
-    lines = t.splitlines()
-    if not lines:
+    t = text.strip()
+    if not t.startswith("```"):
         return t
 
-    inner = "\n".join(lines[1:]).strip()
-    if inner.endswith("```"):
-        inner = inner.rsplit("```", 1)[0].strip()
-    return inner
+    # Drop the opening fence line (``` or ```json) and the closing fence
+    _, _, inner = t.partition("\n")
+    return inner.strip().removesuffix("```").strip()
 
 
 def extract_first_json_object(text: str) -> str:
     """
     Extract the first top-level JSON object {...} from text.
     Robust to leading commentary. Handles strings and escapes.
+    Uses the C-level json decoder first; falls back to a manual brace scan
+    when the object at the first '{' is not valid JSON.
     """
     if not text:
         raise ValueError("Empty model output")
@@ -39,6 +49,12 @@ def extract_first_json_object(text: str) -> str:
     if start < 0:
         raise ValueError("No JSON object start '{' found in output")
 
+    try:
+        _, end = _DECODER.raw_decode(t, start)
+        return t[start:end]
+    except json.JSONDecodeError:
+        pass
+
     depth = 0
     in_str = False
     esc = False
@@ -67,6 +83,60 @@ def extract_first_json_object(text: str) -> str:
     raise ValueError("Unclosed JSON object in output")
 
 
+def read_until_json_object(chunks: Iterable[str]) -> str:
+    """
+    Accumulate streamed text chunks and stop as soon as the first top-level
+    JSON object {...} is complete (same string/escape rules as
+    extract_first_json_object). Returns everything read so far; if the stream
+    ends first, returns the full text and leaves error handling to the parser.
+    """
+    parts: list[str] = []
+    depth = 0
+    in_str = False
+    esc = False
+
+    for chunk in chunks:
+        if not chunk:
+            continue
+        parts.append(chunk)
+        for i, ch in enumerate(chunk):
+            if in_str:
+                if esc:
+                    esc = False
+                elif ch == "\\":
+                    esc = True
+                elif ch == '"':
+                    in_str = False
+                continue
+
+            if ch == '"':
+                in_str = depth > 0
+            elif ch == "{":
+                depth += 1
+            elif ch == "}" and depth > 0:
+                depth -= 1
+                if depth == 0:
+                    parts[-1] = chunk[: i + 1]
+                    return "".join(parts)
+
+    return "".join(parts)
+
+
+_JSON_MODE_PARAMS = ("response_format", "text.format", "text")
+_JSON_MODE_HINTS = ("response_format", "text.format", "json_object", "json mode")
+
+
+def rejects_json_mode(err: Exception) -> bool:
+    """
+    True if an API error (e.g. openai.BadRequestError) is about the JSON-mode
+    request parameter itself, as opposed to any other bad request.
+    """
+    if getattr(err, "param", None) in _JSON_MODE_PARAMS:
+        return True
+    message = str(getattr(err, "message", None) or err).lower()
+    return any(hint in message for hint in _JSON_MODE_HINTS)
+
+
 def coerce_to_json_text(raw: str) -> str:
     """
     Best-effort: strip code fences and extract a JSON object.
@@ -79,26 +149,50 @@ def coerce_to_json_text(raw: str) -> str:
     return extract_first_json_object(cleaned)
 
 
+def loads_json(text: str) -> Any:
+    """
+    Parse JSON with orjson; fall back to stdlib json for inputs orjson
+    rejects but json accepts (e.g. NaN/Infinity).
+    """
+    try:
+        return orjson.loads(text)
+    except orjson.JSONDecodeError:
+        return json.loads(text)
+
+
 def read_output_text_from_response(resp: Any) -> str:
     """
     OpenAI SDK version differences:
     - Some versions expose resp.output_text
     - Others require stitching from resp.output[].content[].text
     """
-    out = getattr(resp, "output_text", None)
+    out = getattr(resp, "output_text", "") or ""
     if out:
-        return (out or "").strip()
+        return out.strip()
 
-    try:
-        parts: list[str] = []
-        for item in getattr(resp, "output", []) or []:
-            if getattr(item, "type", None) == "message":
-                for c in getattr(item, "content", []) or []:
-                    if getattr(c, "type", None) == "output_text":
-                        parts.append(getattr(c, "text", "") or "")
-        return "".join(parts).strip()
-    except Exception:
-        return ""
+    parts: list[str] = []
+    append = parts.append
+    for item in getattr(resp, "output", None) or []:
+        if getattr(item, "type", None) != "message":
+            continue
+        for c in getattr(item, "content", None) or []:
+            if getattr(c, "type", None) == "output_text":
+                append(getattr(c, "text", "") or "")
+    return "".join(parts).strip()
+
+
+@functools.lru_cache(maxsize=32)
+def _schema_prompt(schema: type) -> str:
+    """
+    JSON-schema instructions for `schema`, built once per schema class.
+    """
+    schema_json = schema.model_json_schema()
+    return (
+        "You are a careful planner for a tool-using research agent.\n"
+        "Return ONLY valid JSON. No markdown, no code fences, no extra text.\n"
+        "The JSON must match this JSON Schema:\n"
+        f"{json.dumps(schema_json, ensure_ascii=False)}"
+    )
 
 
 def plan_with_json_retries(
@@ -117,13 +211,10 @@ def plan_with_json_retries(
     - coerces to JSON + pydantic validate
     - retries on JSONDecodeError/ValidationError/ValueError
     """
-    schema_json = schema.model_json_schema()
-    planner_instructions = (
-        "You are a careful planner for a tool-using research agent.\n"
-        "Return ONLY valid JSON. No markdown, no code fences, no extra text.\n"
-        "The JSON must match this JSON Schema:\n"
-        f"{json.dumps(schema_json, ensure_ascii=False)}"
-    )
+    planner_instructions = _schema_prompt(schema)
+    adapter = _ADAPTERS.get(schema)
+    if adapter is None:
+        adapter = _ADAPTERS[schema] = TypeAdapter(schema)
 
     last_err: Exception | None = None
     cur = instruction
@@ -139,9 +230,14 @@ def plan_with_json_retries(
 
         try:
             json_text = coerce_to_json_text(raw)
-            obj = json.loads(json_text)
-            return schema.model_validate(obj)
-        except (json.JSONDecodeError, ValidationError, ValueError) as e:
+            obj = loads_json(json_text)
+            return adapter.validate_python(obj)
+        except (
+            orjson.JSONDecodeError,
+            json.JSONDecodeError,
+            ValidationError,
+            ValueError,
+        ) as e:
             last_err = e
             cur = (
                 "Your previous output was invalid.\n"
@@ -1,16 +1,43 @@
 from __future__ import annotations
+import functools
 import os
 from typing import Any, Dict, Optional, Type, TypeVar, List, Tuple
 
-from openai import OpenAI
+import orjson
+from openai import BadRequestError, OpenAI
 
 from core.models import RedactionResult
+from core.utils import dedup_preserve
 from llm.base import BaseLLM
-from llm.json_fix import plan_with_json_retries
+from llm.cache import RESPONSE_CACHE
+from llm.http import shared_http_client
+from llm.json_fix import (
+    plan_with_json_retries,
+    read_until_json_object,
+    rejects_json_mode,
+)
+from llm.rate_limit import limiter_from_env, max_retries_from_env
 
 T = TypeVar("T")
 
 
+@functools.lru_cache(maxsize=64)
+def _redact_instructions(
+    sensitive_terms: Tuple[str, ...], target_language: str, replacement: str
+) -> str:
+    return (
+        "You are a security redaction engine.\n"
+        "Replace sensitive info with the replacement token.\n"
+        "Preserve text exactly except replacements. No rewriting.\n"
+        "Detect translations/obfuscations/paraphrases referring to the same named items.\n"
+        "Only redact when highly confident.\n"
+        'Return ONLY valid JSON: {"redacted_text": "...", "matched_terms": ["..."]}.\n'
+        f"Target language: {target_language}\n"
+        f"Replacement token: {replacement}\n"
+        f"Sensitive terms: {orjson.dumps(list(sensitive_terms)).decode()}\n"
+    )
+
+
 class FriendliLLM(BaseLLM):
     """
     Friendli Serverless wrapper (OpenAI-compatible).
@@ -34,7 +61,14 @@ class FriendliLLM(BaseLLM):
         self.model = model
         self.base_url = base_url
         self.extra_body = extra_body or {}
-        self.client = OpenAI(api_key=self.token, base_url=self.base_url)
+        self.client = OpenAI(
+            api_key=self.token,
+            base_url=self.base_url,
+            http_client=shared_http_client(),
+            max_retries=max_retries_from_env(),
+        )
+        self.limiter = limiter_from_env("FRIENDLI_RPM")
+        self.json_mode = True
 
         if debug_plan is None:
             debug_plan = os.getenv("FRIENDLI_DEBUG_PLAN", "0").strip().lower() in (
@@ -52,19 +86,68 @@ class FriendliLLM(BaseLLM):
         max_tokens: int,
         temperature: float,
         extra_body: Optional[Dict[str, Any]] = None,
+        json_output: bool = False,
     ) -> str:
-        completion = self.client.chat.completions.create(
-            model=self.model,
-            extra_body=(self.extra_body | (extra_body or {})),
-            messages=[
-                {"role": "system", "content": instructions},
-                {"role": "user", "content": input_text},
-            ],
-            max_tokens=max_tokens,
-            temperature=temperature,
-            stream=False,
+        """
+        json_output=True is for calls that must return one JSON object:
+        - requests JSON mode (response_format=json_object) so malformed output
+          doesn't cost a plan_with_json_retries() round-trip; dropped for the
+          rest of the session if the endpoint rejects it
+        - streams the completion and closes it as soon as the first JSON object
+          is complete, skipping any trailing tokens
+        """
+        body = self.extra_body | (extra_body or {})
+
+        def _call() -> str:
+            self.limiter.acquire()
+            kwargs: Dict[str, Any] = {}
+            if json_output and self.json_mode:
+                kwargs["response_format"] = {"type": "json_object"}
+            try:
+                completion = self.client.chat.completions.create(
+                    model=self.model,
+                    extra_body=body,
+                    messages=[
+                        {"role": "system", "content": instructions},
+                        {"role": "user", "content": input_text},
+                    ],
+                    max_tokens=max_tokens,
+                    temperature=temperature,
+                    stream=json_output,
+                    **kwargs,
+                )
+            except BadRequestError as e:
+                if not kwargs or not rejects_json_mode(e):
+                    raise
+                self.json_mode = False
+                return _call()
+            if not json_output:
+                return (completion.choices[0].message.content or "").strip()
+
+            try:
+                return read_until_json_object(
+                    (chunk.choices[0].delta.content or "")
+                    for chunk in completion
+                    if chunk.choices
+                ).strip()
+            finally:
+                completion.close()
+
+        if temperature > 0:
+            return _call()
+
+        return RESPONSE_CACHE.get_or_call(
+            {
+                "model": self.model,
+                "instructions": instructions,
+                "input_text": input_text,
+                "temperature": temperature,
+                "max_tokens": max_tokens,
+                "extra_body": body,
+                "json_output": json_output,
+            },
+            _call,
         )
-        return (completion.choices[0].message.content or "").strip()
 
     def generate_text(self, instructions: str, input_text: str) -> str:
         return self._generate_text_impl(
@@ -74,13 +157,25 @@ class FriendliLLM(BaseLLM):
             temperature=0.2,
         )
 
-    def plan(self, instruction: str, schema: Type[T], retries: int = 2) -> T:
+    def plan(
+        self,
+        instruction: str,
+        schema: Type[T],
+        retries: int = 2,
+        *,
+        system: Optional[str] = None,
+    ) -> T:
+        instructions = "You are a careful planner for a tool-using research agent."
+        if system:
+            instructions = f"{instructions}\n\n{system}"
+
         def _gen(prompt: str) -> str:
             return self._generate_text_impl(
-                instructions="You are a careful planner for a tool-using research agent.",
+                instructions=instructions,
                 input_text=prompt,
                 max_tokens=900,
                 temperature=0.0,
+                json_output=True,
             )
 
         return plan_with_json_retries(
@@ -93,6 +188,9 @@ class FriendliLLM(BaseLLM):
         )
 
     def translate(self, text: str, target_language: str) -> str:
+        if not (text or "").strip():
+            return ""
+
         instr = (
             "You are a professional translator. "
             "Translate the user's text into the target language. "
@@ -106,11 +204,10 @@ class FriendliLLM(BaseLLM):
         )
 
     def summarize(self, text: str, target_language: str, max_words: int = 180) -> str:
-        instr = (
-            "You are a precise analyst. Summarize the text for a company briefing. "
-            f"Write the summary in {target_language}. "
-            f"Keep it under {max_words} words. Return only the summary."
-        )
+        if not (text or "").strip():
+            return ""
+
+        instr = self.summarize_instructions(target_language, max_words)
         return self._generate_text_impl(
             instructions=instr,
             input_text=f"Text:\n{text}",
@@ -118,6 +215,28 @@ class FriendliLLM(BaseLLM):
             temperature=0.2,
         )
 
+    def _json_call(self, instructions: str, input_text: str, *, max_tokens: int) -> str:
+        return self._generate_text_impl(
+            instructions=instructions,
+            input_text=input_text,
+            max_tokens=max_tokens,
+            temperature=0.2,
+            json_output=True,
+        )
+
+    def redact_instructions(
+        self,
+        sensitive_terms: List[str],
+        *,
+        target_language: Optional[str] = None,
+        replacement: str = "[REDACTED]",
+    ) -> str:
+        return _redact_instructions(
+            tuple(sorted(set(sensitive_terms))),
+            target_language or "auto",
+            replacement,
+        )
+
     def redact(
         self,
         text: str,
@@ -126,23 +245,16 @@ class FriendliLLM(BaseLLM):
         target_language: Optional[str] = None,
         replacement: str = "[REDACTED]",
     ) -> Tuple[str, List[str]]:
-        lang = target_language or "auto"
-
-        instructions = (
-            "You are a security redaction engine.\n"
-            "Replace sensitive info with the replacement token.\n"
-            "Preserve text exactly except replacements. No rewriting.\n"
-            "Detect translations/obfuscations/paraphrases referring to the same named items.\n"
-            "Only redact when highly confident.\n"
-            'Return ONLY valid JSON: {"redacted_text": "...", "matched_terms": ["..."]}.\n'
-        )
+        # Nothing to find or nothing to search: skip the round-trip
+        if not sensitive_terms or not (text or "").strip():
+            return text or "", []
 
-        payload = {
-            "target_language": lang,
-            "replacement": replacement,
-            "sensitive_terms": sensitive_terms,
-            "text": text,
-        }
+        # Terms/language/replacement go in the (stable, cacheable) instructions
+        # prefix; only the document text varies per call
+        instructions = self.redact_instructions(
+            sensitive_terms, target_language=target_language, replacement=replacement
+        )
+        payload = {"text": text}
 
         def _gen(prompt: str) -> str:
             return self._generate_text_impl(
@@ -150,10 +262,11 @@ class FriendliLLM(BaseLLM):
                 input_text=prompt,
                 max_tokens=1200,
                 temperature=0.0,
+                json_output=True,
             )
 
         result = plan_with_json_retries(
-            instruction=str(payload),
+            instruction=orjson.dumps(payload).decode(),
             schema=RedactionResult,
             generate_text=_gen,
             retries=2,
@@ -161,6 +274,4 @@ class FriendliLLM(BaseLLM):
             debug_prefix="REDACT/Friendli",
         )
 
-        return (result.redacted_text or ""), list(
-            dict.fromkeys(result.matched_terms or [])
-        )
+        return (result.redacted_text or ""), dedup_preserve(result.matched_terms or [])
@@ -1,19 +1,47 @@
 from __future__ import annotations
+import functools
 import os
-from typing import Optional, Type, TypeVar, List, Tuple
+from typing import Any, Dict, Optional, Type, TypeVar, List, Tuple
 
-from openai import OpenAI
+import orjson
+from openai import BadRequestError, OpenAI
 
 from core.models import RedactionResult
+from core.utils import dedup_preserve
 from llm.base import BaseLLM
+from llm.http import shared_http_client
 from llm.json_fix import (
     plan_with_json_retries,
     read_output_text_from_response,
+    read_until_json_object,
+    rejects_json_mode,
 )
+from llm.rate_limit import limiter_from_env, max_retries_from_env
 
 T = TypeVar("T")
 
 
+@functools.lru_cache(maxsize=64)
+def _redact_instructions(
+    sensitive_terms: Tuple[str, ...], target_language: str, replacement: str
+) -> str:
+    return (
+        "You are a security redaction engine.\n"
+        "Task: Replace any occurrence of sensitive information in the given text with the replacement token.\n"
+        "You MUST:\n"
+        "1) Preserve the original text exactly except for replacements (no rewriting).\n"
+        "2) Detect occurrences even if:\n"
+        "   - translated into the target language\n"
+        "   - lightly paraphrased while clearly referring to the same named project/initiative\n"
+        "   - obfuscated with spaces/punctuation/hyphens/dots/underscores or mixed case\n"
+        "3) Only redact when you are highly confident it refers to one of the provided sensitive terms.\n"
+        "Output MUST be valid JSON with keys: redacted_text (string), matched_terms (string[] of ORIGINAL terms).\n"
+        f"Target language: {target_language}\n"
+        f"Replacement token: {replacement}\n"
+        f"Sensitive terms: {orjson.dumps(list(sensitive_terms)).decode()}\n"
+    )
+
+
 class OpenAILLM(BaseLLM):
     """
     OpenAI wrapper using the Responses API.
@@ -27,7 +55,12 @@ class OpenAILLM(BaseLLM):
         model: Optional[str] = None,
         debug_plan: Optional[bool] = None,
     ):
-        self.client = OpenAI()
+        self.client = OpenAI(
+            http_client=shared_http_client(),
+            max_retries=max_retries_from_env(),
+        )
+        self.limiter = limiter_from_env("OPENAI_RPM")
+        self.json_mode = True
         self.model = model or "gpt-5"
 
         if debug_plan is None:
@@ -38,14 +71,20 @@ class OpenAILLM(BaseLLM):
             )
         self.debug_plan = debug_plan
 
-    def plan(self, instruction: str, schema: Type[T], retries: int = 2) -> T:
+    def plan(
+        self,
+        instruction: str,
+        schema: Type[T],
+        retries: int = 2,
+        *,
+        system: Optional[str] = None,
+    ) -> T:
+        instructions = "You are a careful planner for a tool-using research agent."
+        if system:
+            instructions = f"{instructions}\n\n{system}"
+
         def _gen(prompt: str) -> str:
-            resp = self.client.responses.create(
-                model=self.model,
-                instructions="You are a careful planner for a tool-using research agent.",
-                input=prompt,
-            )
-            return read_output_text_from_response(resp)
+            return self._create_text(instructions, prompt, json_output=True)
 
         return plan_with_json_retries(
             instruction=instruction,
@@ -56,7 +95,48 @@ class OpenAILLM(BaseLLM):
             debug_prefix="PLAN/OpenAI",
         )
 
-    def generate_text(self, instructions: str, input_text: str) -> str:
+    def _create_text(
+        self,
+        instructions: str,
+        input_text: str,
+        *,
+        json_output: bool = False,
+    ) -> str:
+        """
+        responses.create() -> output text.
+        Not served from RESPONSE_CACHE: no temperature is sent (reasoning models
+        reject it), so these calls are not deterministic.
+        json_output=True is for calls that must return one JSON object: it
+        requests JSON mode (dropped for the session if the model rejects it) and
+        streams the response, closing it as soon as the first JSON object is complete.
+        """
+        self.limiter.acquire()
+        if json_output:
+            kwargs: Dict[str, Any] = {}
+            if self.json_mode:
+                kwargs["text"] = {"format": {"type": "json_object"}}
+            try:
+                stream = self.client.responses.create(
+                    model=self.model,
+                    instructions=instructions,
+                    input=input_text,
+                    stream=True,
+                    **kwargs,
+                )
+            except BadRequestError as e:
+                if not kwargs or not rejects_json_mode(e):
+                    raise
+                self.json_mode = False
+                return self._create_text(instructions, input_text, json_output=True)
+            try:
+                return read_until_json_object(
+                    event.delta
+                    for event in stream
+                    if event.type == "response.output_text.delta"
+                ).strip()
+            finally:
+                stream.close()
+
         resp = self.client.responses.create(
             model=self.model,
             instructions=instructions,
@@ -64,7 +144,13 @@ class OpenAILLM(BaseLLM):
         )
         return read_output_text_from_response(resp)
 
+    def generate_text(self, instructions: str, input_text: str) -> str:
+        return self._create_text(instructions, input_text)
+
     def translate(self, text: str, target_language: str) -> str:
+        if not (text or "").strip():
+            return ""
+
         instr = (
             "You are a professional translator. "
             "Translate the user's text into the target language. "
@@ -76,16 +162,31 @@ class OpenAILLM(BaseLLM):
         )
 
     def summarize(self, text: str, target_language: str, max_words: int = 180) -> str:
-        instr = (
-            "You are a precise analyst. Summarize the text for a company briefing. "
-            f"Write the summary in {target_language}. "
-            f"Keep it under {max_words} words. Return only the summary."
-        )
+        if not (text or "").strip():
+            return ""
+
+        instr = self.summarize_instructions(target_language, max_words)
         return self.generate_text(
             instructions=instr,
             input_text=f"Text:\n{text}",
         )
 
+    def _json_call(self, instructions: str, input_text: str, *, max_tokens: int) -> str:
+        return self._create_text(instructions, input_text, json_output=True)
+
+    def redact_instructions(
+        self,
+        sensitive_terms: List[str],
+        *,
+        target_language: Optional[str] = None,
+        replacement: str = "[REDACTED]",
+    ) -> str:
+        return _redact_instructions(
+            tuple(sorted(set(sensitive_terms))),
+            target_language or "auto",
+            replacement,
+        )
+
     def redact(
         self,
         text: str,
@@ -94,38 +195,22 @@ class OpenAILLM(BaseLLM):
         target_language: Optional[str] = None,
         replacement: str = "[REDACTED]",
     ) -> Tuple[str, List[str]]:
-        lang = target_language or "auto"
-
-        instructions = (
-            "You are a security redaction engine.\n"
-            "Task: Replace any occurrence of sensitive information in the given text with the replacement token.\n"
-            "You MUST:\n"
-            "1) Preserve the original text exactly except for replacements (no rewriting).\n"
-            "2) Detect occurrences even if:\n"
-            "   - translated into the target language\n"
-            "   - lightly paraphrased while clearly referring to the same named project/initiative\n"
-            "   - obfuscated with spaces/punctuation/hyphens/dots/underscores or mixed case\n"
-            "3) Only redact when you are highly confident it refers to one of the provided sensitive terms.\n"
-            "Output MUST be valid JSON with keys: redacted_text (string), matched_terms (string[] of ORIGINAL terms).\n"
+        # Nothing to find or nothing to search: skip the round-trip
+        if not sensitive_terms or not (text or "").strip():
+            return text or "", []
+
+        # Terms/language/replacement go in the (stable, cacheable) instructions
+        # prefix; only the document text varies per call
+        instructions = self.redact_instructions(
+            sensitive_terms, target_language=target_language, replacement=replacement
         )
-
-        payload = {
-            "target_language": lang,
-            "replacement": replacement,
-            "sensitive_terms": sensitive_terms,
-            "text": text,
-        }
+        payload = {"text": text}
 
         def _gen(prompt: str) -> str:
-            resp = self.client.responses.create(
-                model=self.model,
-                instructions=instructions,
-                input=prompt,
-            )
-            return read_output_text_from_response(resp)
+            return self._create_text(instructions, prompt, json_output=True)
 
         result = plan_with_json_retries(
-            instruction=str(payload),
+            instruction=orjson.dumps(payload).decode(),
             schema=RedactionResult,
             generate_text=_gen,
             retries=2,
@@ -133,6 +218,4 @@ class OpenAILLM(BaseLLM):
             debug_prefix="REDACT/OpenAI",
         )
 
-        return (result.redacted_text or ""), list(
-            dict.fromkeys(result.matched_terms or [])
-        )
+        return (result.redacted_text or ""), dedup_preserve(result.matched_terms or [])
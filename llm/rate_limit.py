@@ -0,0 +1,44 @@
+from __future__ import annotations
+import functools
+import os
+import threading
+import time
+
+
+class RateLimiter:
+    """
+    Thread-safe requests-per-minute limiter.
+    Calls are spaced at least 60/rpm seconds apart across all threads;
+    rpm <= 0 disables limiting.
+    """
+
+    def __init__(self, rpm: float):
+        self.interval = 60.0 / rpm if rpm > 0 else 0.0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            wait = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if wait > 0:
+            time.sleep(wait)
+
+
+@functools.lru_cache(maxsize=None)
+def limiter_from_env(env_var: str) -> RateLimiter:
+    """
+    Process-wide limiter per provider, e.g. OPENAI_RPM=500 / FRIENDLI_RPM=60.
+    """
+    return RateLimiter(float(os.getenv(env_var, "0") or 0))
+
+
+def max_retries_from_env() -> int:
+    """
+    Retries for transient 429/5xx/connection errors; the OpenAI SDK applies
+    exponential backoff with jitter (and honors Retry-After) between attempts.
+    """
+    return int(os.getenv("LLM_MAX_RETRIES", "5"))
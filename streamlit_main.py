@@ -1,9 +1,12 @@
 import os
-import json
+import orjson
 import streamlit as st
 from dotenv import load_dotenv
 
 from core.agent import ResearchBriefingAgent
+from core.plan_cache import PlanCache
+from core.utils import dedup_preserve
+from llm.cache import RESPONSE_CACHE
 from llm.open_source_client import FriendliLLM
 from llm.openai_client import OpenAILLM
 
@@ -11,25 +14,72 @@ from llm.openai_client import OpenAILLM
 def build_llm(provider: str):
     provider = (provider or "").lower().strip()
 
+    # Resolve env here and pass the values in, so a changed env var is a new cache key
     if provider == "openai":
-        return OpenAILLM(model=os.getenv("OPENAI_MODEL", "gpt-4.1"))
+        return _build_llm_cached(
+            provider, model=os.getenv("OPENAI_MODEL", "gpt-4.1"), base_url="", token=""
+        )
 
     if provider in ("friendli", "oss", "open_source", "opensource"):
-        token = os.getenv("FRIENDLI_TOKEN", "")
-        model = os.getenv("FRIENDLI_MODEL", "mistralai/Magistral-Small-2506")
-        base_url = os.getenv(
-            "FRIENDLI_BASE_URL", "https://api.friendli.ai/serverless/v1"
+        return _build_llm_cached(
+            "friendli",
+            model=os.getenv("FRIENDLI_MODEL", "mistralai/Magistral-Small-2506"),
+            base_url=os.getenv(
+                "FRIENDLI_BASE_URL", "https://api.friendli.ai/serverless/v1"
+            ),
+            token=os.getenv("FRIENDLI_TOKEN", ""),
         )
-        return FriendliLLM(token=token, model=model, base_url=base_url)
 
     raise ValueError(f"Unknown provider: {provider}. Use openai|friendli")
 
 
+@st.cache_resource(show_spinner=False)
+def _build_llm_cached(provider: str, model: str, base_url: str, token: str):
+    """
+    One client per (provider, model, base_url, token), reused across reruns
+    so its connection pool stays warm.
+    """
+    if provider == "openai":
+        return OpenAILLM(model=model)
+    return FriendliLLM(token=token, model=model, base_url=base_url)
+
+
+_ENV_VARS_BLOCK = "\n".join(
+    [
+        "OPENAI_MODEL",
+        "FRIENDLI_TOKEN",
+        "FRIENDLI_MODEL",
+        "FRIENDLI_BASE_URL",
+    ]
+)
+
+
+@st.cache_data(show_spinner=False)
+def _render_doc_card_html(title: str, company: str) -> str:
+    return f"""
+                <div style="display:flex;align-items:center;gap:12px;padding:12px;border:1px solid #2a2a2a;border-radius:10px;">
+                    <div style="font-size:34px;">📄</div>
+                    <div>
+                        <div style="font-weight:700;">{title}</div>
+                        <div style="font-size:12px;color:#9aa0a6;">
+                            company={company}
+                        </div>
+                    </div>
+                </div>
+                """
+
+
 def load_json(path: str):
     if not os.path.exists(path):
         return []
-    with open(path, "r", encoding="utf-8") as f:
-        return json.load(f)
+    # mtime is part of the cache key so edited data files are picked up on rerun
+    return _load_json_cached(path, os.path.getmtime(path))
+
+
+@st.cache_data(show_spinner=False)
+def _load_json_cached(path: str, mtime: float):
+    with open(path, "rb") as f:
+        return orjson.loads(f.read())
 
 
 def find_default_index(options, predicate, fallback: int = 0) -> int:
@@ -48,24 +98,36 @@ def _extract_target_language_from_plan(res) -> str:
         return "en"
 
 
-def get_sensitive_terms_for_company(companies: list, company_name: str) -> list[str]:
+def load_company_index(path: str) -> dict:
+    """
+    Lowercase company name -> profile, built once per (path, mtime).
+    """
+    if not os.path.exists(path):
+        return {}
+    return _company_index_cached(path, os.path.getmtime(path))
+
+
+@st.cache_data(show_spinner=False)
+def _company_index_cached(path: str, mtime: float) -> dict:
+    # reversed(): the first profile with a given name wins, as with a linear scan
+    return {
+        (c.get("name") or "").strip().lower(): c
+        for c in reversed(_load_json_cached(path, mtime))
+    }
+
+
+def get_sensitive_terms_for_company(
+    company_index: dict, company_name: str
+) -> list[str]:
     """
     Return sensitive terms (sensitive_projects) for the selected company from synth_companies.json.
     Deduplicate while preserving order.
     """
-    name = (company_name or "").strip().lower()
-    for c in companies or []:
-        if (c.get("name") or "").strip().lower() == name:
-            terms = c.get("sensitive_projects") or []
-            seen = set()
-            out = []
-            for t in terms:
-                t = (t or "").strip()
-                if t and t not in seen:
-                    seen.add(t)
-                    out.append(t)
-            return out
-    return []
+    c = company_index.get((company_name or "").strip().lower())
+    if c is None:
+        return []
+    terms = c.get("sensitive_projects") or []
+    return dedup_preserve(t.strip() for t in terms if t and t.strip())
 
 
 def main():
@@ -78,6 +140,7 @@ def main():
 
     # Load mock data
     companies = load_json("data/synth_companies.json")
+    company_index = load_company_index("data/synth_companies.json")
     internal_docs_all = load_json("data/internal_docs.json")
 
     company_names = [c.get("name", "UnknownCo") for c in companies] or [
@@ -108,6 +171,9 @@ def main():
             options=company_names,
             index=default_company_idx,
         )
+        sensitive_terms = get_sensitive_terms_for_company(
+            company_index, selected_company
+        )
 
         def same_company(doc):
             return (doc.get("company") or "").strip().lower() == (
@@ -145,17 +211,10 @@ def main():
 
         if chosen_doc:
             st.markdown(
-                f"""
-                <div style="display:flex;align-items:center;gap:12px;padding:12px;border:1px solid #2a2a2a;border-radius:10px;">
-                    <div style="font-size:34px;">📄</div>
-                    <div>
-                        <div style="font-weight:700;">{chosen_doc.get("title","Internal.pdf")}</div>
-                        <div style="font-size:12px;color:#9aa0a6;">
-                            company={chosen_doc.get("company","")}
-                        </div>
-                    </div>
-                </div>
-                """,
+                _render_doc_card_html(
+                    chosen_doc.get("title", "Internal.pdf"),
+                    chosen_doc.get("company", ""),
+                ),
                 unsafe_allow_html=True,
             )
 
@@ -189,17 +248,7 @@ def main():
             trace_path = st.text_input("Trace path", value="runs/streamlit_run.jsonl")
 
             st.caption("Env vars used:")
-            st.code(
-                "\n".join(
-                    [
-                        "OPENAI_MODEL",
-                        "FRIENDLI_TOKEN",
-                        "FRIENDLI_MODEL",
-                        "FRIENDLI_BASE_URL",
-                    ]
-                ),
-                language="text",
-            )
+            st.code(_ENV_VARS_BLOCK, language="text")
 
         st.write("")
 
@@ -210,13 +259,14 @@ def main():
             st.write(f"**Selected model:** {llm_provider_label}")
             st.write(f"**Internal doc:** {(chosen_doc or {}).get('title','(none)')}")
             st.write(f"**Internal doc length:** {len(internal_text or '')} chars")
-            st.write(
-                f"**Sensitive terms (from JSON):** {get_sensitive_terms_for_company(companies, selected_company)}"
-            )
+            st.write(f"**Sensitive terms (from JSON):** {sensitive_terms}")
+            if RESPONSE_CACHE.enabled:
+                st.write(
+                    f"**LLM response cache:** {RESPONSE_CACHE.stats['hits']} hits / "
+                    f"{RESPONSE_CACHE.stats['misses']} misses"
+                )
 
     if run_btn:
-        sensitive_terms = get_sensitive_terms_for_company(companies, selected_company)
-
         llm = build_llm(provider_label_to_value[llm_provider_label])
 
         agent = ResearchBriefingAgent(
@@ -225,6 +275,7 @@ def main():
             company_db_path="data/synth_companies.json",
             sensitive_terms=sensitive_terms,
             enable_live_web=enable_live_web,
+            plan_cache=PlanCache("runs/plan_cache.json"),
         )
 
         with st.spinner("Running agent..."):
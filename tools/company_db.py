@@ -1,18 +1,31 @@
-import json
+import functools
+import os
 from typing import Any, Dict
 
+import orjson
+
+
+@functools.lru_cache(maxsize=8)
+def _load_index(db_path: str, mtime: float) -> Dict[str, Dict[str, Any]]:
+    """
+    Parse the DB once per (path, mtime) into a lowercase-name -> profile index.
+    """
+    with open(db_path, "rb") as f:
+        companies = orjson.loads(f.read())
+    return {c.get("name", "").lower(): c for c in reversed(companies)}
+
 
 def get_company_info(company_name: str, db_path: str) -> Dict[str, Any]:
     """
     Simulated internal DB lookup.
     db is a JSON list of company profiles.
     """
-    with open(db_path, "r", encoding="utf-8") as f:
-        companies = json.load(f)
+    index = _load_index(db_path, os.path.getmtime(db_path))
 
-    for c in companies:
-        if c.get("name", "").lower() == company_name.lower():
-            return c
+    c = index.get(company_name.lower())
+    if c is not None:
+        # Shallow copy: the cached profile must not be mutated by callers
+        return dict(c)
 
     # Fallback
     return {
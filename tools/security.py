@@ -1,37 +1,162 @@
+import functools
+import itertools
 import re
-from typing import List, Tuple, Optional
+from typing import Any, List, Tuple, Optional
 
+from core.utils import compact_blank_lines, dedup_preserve
 from llm.base import BaseLLM
+from llm.cache import cache_key, disk_cached
 
 
+_GAP = r"[\s\.\-_]*"
+_WORD_GAP = r"[\s\.\-_]+"
+_SEPARATORS = re.compile(r"[\s\.\-_]+")
+
+
+# ASCII separators matched by _GAP, for str.translate() deletion
+_DELETE_SEPARATORS = dict.fromkeys(map(ord, " \t\n\r\x0b\x0c\x1c\x1d\x1e\x1f.-_"))
+
+
+@functools.lru_cache(maxsize=4096)
 def _variant_pattern(term: str) -> re.Pattern:
     """
     Build a regex that matches common obfuscations like:
     "Project Phoenix", "Project.Phoenix", "P r o j e c t  P h o e n i x"
+    Where the term has a separator at least one is required ("AI Lab" does not
+    match inside "available"); gaps inside a word are optional. Every gap is a
+    separator class that never overlaps the literal characters around it:
+    each input position has one way to match, so `re` cannot backtrack
+    super-linearly.
     """
-    escaped = [re.escape(ch) for ch in term]
-    pat = r"[\s\.\-_]*".join(escaped)
+    words = [w for w in _SEPARATORS.split(term) if w] or [term]
+    pat = _WORD_GAP.join(_GAP.join(re.escape(ch) for ch in w) for w in words)
     return re.compile(pat, flags=re.IGNORECASE)
 
 
-def security_filter(document: str, sensitive_terms: List[str]) -> Tuple[str, List[str]]:
+# (terms, combined pattern): one alternation over all term variants, with
+# named group t<i> identifying terms[i]; pattern is None when there are no terms
+CompiledTerms = Tuple[Tuple[str, ...], Optional[re.Pattern]]
+
+
+def compile_sensitive_terms(sensitive_terms: List[str]) -> CompiledTerms:
+    """
+    Precompile all non-blank terms into a single alternation so a document is
+    scanned once, instead of once per term.
+    Longer terms are tried first, so "Project Phoenix" wins over "Phoenix".
+    Build once and pass as `patterns` to reuse across documents; calls with
+    the same term list also share one cached compilation.
+    """
+    return _compile_terms(tuple(term for term in sensitive_terms if term.strip()))
+
+
+@functools.lru_cache(maxsize=64)
+def _compile_terms(terms: Tuple[str, ...]) -> CompiledTerms:
+    if not terms:
+        return terms, None
+
+    order = sorted(range(len(terms)), key=lambda i: len(terms[i]), reverse=True)
+    alternation = "|".join(
+        f"(?P<t{i}>{_variant_pattern(terms[i].strip()).pattern})" for i in order
+    )
+    return terms, re.compile(alternation, flags=re.IGNORECASE)
+
+
+_ENGLISH = {"en", "english"}
+
+
+@functools.lru_cache(maxsize=32)
+def _residual_pattern(sensitive_terms: Tuple[str, ...]) -> Optional[re.Pattern]:
+    """
+    Match any distinctive word (4+ chars) of any sensitive term, e.g. "Phoenix"
+    from "Project Phoenix". Used to decide whether a regex-clean document may
+    still hold a partial or paraphrased reference worth an LLM pass.
+    """
+    words = {
+        w for term in sensitive_terms for w in _SEPARATORS.split(term) if len(w) >= 4
+    }
+    if not words:
+        return None
+    alternation = "|".join(re.escape(w) for w in sorted(words, key=len, reverse=True))
+    return re.compile(rf"\b(?:{alternation})\b", flags=re.IGNORECASE)
+
+
+@functools.lru_cache(maxsize=64)
+def _prefilter_keys(terms: Tuple[str, ...]) -> Optional[Tuple[str, ...]]:
+    """
+    Lowercased terms with separators deleted; None (no prefilter) if any term
+    is non-ASCII or made only of separators, since such a term's pattern can
+    match text that the stripped document doesn't contain.
+    """
+    if not all(term.isascii() for term in terms):
+        return None
+    keys = tuple(term.lower().translate(_DELETE_SEPARATORS) for term in terms)
+    return keys if all(keys) else None
+
+
+def security_filter(
+    document: str,
+    sensitive_terms: List[str],
+    patterns: Optional[CompiledTerms] = None,
+) -> Tuple[str, List[str]]:
     """
     Regex-based redaction. Returns (filtered_doc, redacted_terms).
     """
-    redacted: List[str] = []
-    out = document
+    if patterns is None:
+        patterns = compile_sensitive_terms(sensitive_terms)
+
+    terms, combined = patterns
+    if combined is None:
+        return document, []
+
+    # Exact pre-filter: any variant match is the term's characters separated
+    # only by separators, so with separators deleted and case folded the doc
+    # must contain the flattened term. Two C-level passes instead of the
+    # alternation scan on clean docs. ASCII-only, where lower() agrees with
+    # re.IGNORECASE.
+    keys = _prefilter_keys(terms)
+    if keys is not None and document.isascii():
+        flat = document.lower().translate(_DELETE_SEPARATORS)
+        if not any(key in flat for key in keys):
+            return document, []
 
-    for term in sensitive_terms:
-        if not term.strip():
-            continue
-        pattern = _variant_pattern(term.strip())
-        if pattern.search(out):
-            out = pattern.sub("[REDACTED]", out)
-            redacted.append(term)
+    hit_groups = set()
 
+    def _replace(m: re.Match) -> str:
+        hit_groups.add(m.lastgroup)
+        return "[REDACTED]"
+
+    out, count = combined.subn(_replace, document)
+    if not count:
+        return document, []
+
+    redacted = [term for i, term in enumerate(terms) if f"t{i}" in hit_groups]
     return out, redacted
 
 
+@disk_cached()
+def _cached_llm_redact(
+    llm: BaseLLM,
+    text: str,
+    sensitive_terms: Tuple[str, ...],
+    target_language: Optional[str],
+    replacement: str,
+    prompt_fingerprint: str,
+) -> Optional[List[Any]]:
+    """
+    llm.redact() behind the exact-match disk cache (keyed by sha256 over
+    client/model, text, terms, language, replacement and a fingerprint of the
+    redaction instructions; the fingerprint is only part of the key).
+    Returns None (not cached) when the LLM produced no text.
+    """
+    llm_out, llm_hits = llm.redact(
+        text=text,
+        sensitive_terms=list(sensitive_terms),
+        target_language=target_language,
+        replacement=replacement,
+    )
+    return [llm_out, llm_hits] if llm_out else None
+
+
 def hybrid_security_filter(
     document: str,
     sensitive_terms: List[str],
@@ -40,6 +165,7 @@ def hybrid_security_filter(
     target_language: Optional[str] = None,
     replacement: str = "[REDACTED]",
     enable_llm: bool = True,
+    patterns: Optional[CompiledTerms] = None,
 ) -> Tuple[str, List[str]]:
     """
     Two-pass redaction:
@@ -48,25 +174,45 @@ def hybrid_security_filter(
 
     Returns (final_doc, redacted_terms_original_list)
     """
+    if not sensitive_terms or not (document or "").strip():
+        return document or "", []
+
     # Pass 1: regex
     regex_out, regex_hits = security_filter(
-        document=document, sensitive_terms=sensitive_terms
+        document=document, sensitive_terms=sensitive_terms, patterns=patterns
     )
 
     if not enable_llm:
         return regex_out, sorted(set(regex_hits))
 
+    # Fast path: for English output the regex already covers literal terms and
+    # separator obfuscations; only pay for the LLM pass if some fragment of a
+    # term survived (possible partial/paraphrased reference).
+    # Other or unknown languages always go to the LLM (translated references).
+    if (target_language or "").strip().lower() in _ENGLISH:
+        residual = _residual_pattern(tuple(sensitive_terms))
+        if residual is None or not residual.search(regex_out):
+            return regex_out, regex_hits
+
     # Pass 2: LLM
     # - Use the regex output as input to reduce surface area + token usage
     # - Ask model to only redact when highly confident and preserve text except replacements
-    llm_out, llm_hits = llm.redact(
-        text=regex_out,
-        sensitive_terms=sensitive_terms,
-        target_language=target_language,
-        replacement=replacement,
-    )
+    llm_out, llm_hits = _cached_llm_redact(
+        llm,
+        compact_blank_lines(regex_out),
+        tuple(sensitive_terms),
+        target_language,
+        replacement,
+        cache_key(
+            llm.redact_instructions(
+                sensitive_terms,
+                target_language=target_language,
+                replacement=replacement,
+            )
+        ),
+    ) or ("", [])
 
-    merged_hits = list(dict.fromkeys((regex_hits or []) + (llm_hits or [])))
+    merged_hits = dedup_preserve(itertools.chain(regex_hits or (), llm_hits or ()))
 
     # Safety: if LLM returns empty for some reason, fall back to regex output
     final_doc = llm_out or regex_out
@@ -1,5 +1,7 @@
 from typing import Any
 
+from core.utils import compact_blank_lines
+
 
 def translate_document(
     document: str,
@@ -33,7 +35,7 @@ def translate_document(
         )
         return llm.generate_text(
             instructions=instructions,
-            input_text=f"Target language: {target_language}\n\nMarkdown:\n{document}",
+            input_text=f"Target language: {target_language}\n\nMarkdown:\n{compact_blank_lines(document)}",
         )
 
     # Plain translation
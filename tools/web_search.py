@@ -1,8 +1,68 @@
-import re
-from typing import Any, Dict, List
+import copy
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import MappingProxyType
+from typing import Any, Dict, List, Tuple
 import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
+from llm.cache import DiskCache, cache_key
+
+
+def _build_session() -> requests.Session:
+    """
+    Shared session: keep-alive connections are reused across crawl_url calls
+    (same host for the default Wikipedia URLs), with light retry on transient errors.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=32,
+        pool_maxsize=64,
+        max_retries=Retry(
+            total=2, backoff_factor=0.3, status_forcelist=(429, 500, 502, 503, 504)
+        ),
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update(
+        {"User-Agent": "mvp-agent/0.1", "Accept-Encoding": "gzip, deflate"}
+    )
+    return session
+
+
+_SESSION = _build_session()
+
+# lxml (C parser) when installed, else the stdlib parser; only <p> tags are built
+try:
+    import lxml  # noqa: F401
+
+    _HTML_PARSER = "lxml"
+except ImportError:
+    _HTML_PARSER = "html.parser"
+
+_ONLY_P = SoupStrainer("p")
+
+MAX_TEXT_CHARS = 12000
+MAX_HTML_BYTES = 1024 * 1024
+
+# Extracted page text is kept on disk when CRAWL_CACHE=1 (opt-in, like
+# LLM_CACHE); the default (Wikipedia) pages change slowly
+CRAWL_CACHE_ENABLED = os.getenv("CRAWL_CACHE", "0").strip().lower() in (
+    "1",
+    "true",
+    "yes",
+)
+_CRAWL_CACHE = DiskCache("runs/crawl_cache")
+CRAWL_CACHE_MAX_AGE = float(os.getenv("CRAWL_CACHE_MAX_AGE", str(24 * 3600)))
+
+SEARCH_CACHE_TTL = 3600.0
+_SEARCH_CACHE_MAXSIZE = 512
+_SEARCH_CACHE: Dict[Tuple[str, bool, int], Tuple[float, Dict[str, Any]]] = {}
+_SEARCH_LOCK = threading.Lock()
 
 DEFAULT_MOCK = {
     "Tesla": {
@@ -21,6 +81,9 @@ DEFAULT_MOCK = {
     },
 }
 
+# Case-insensitive, read-only view shared across threads
+_MOCK_LOOKUP = MappingProxyType({k.casefold(): v for k, v in DEFAULT_MOCK.items()})
+
 
 def mock_web_search(
     company_name: str, enable_live: bool = False, max_pages: int = 2
@@ -29,8 +92,31 @@ def mock_web_search(
     MVP web tool:
     - Default: return mocked URLs and partnerships.
     - If enable_live=True: crawl the URLs (mock or wikipedia) and extract text.
+    Results are memoized per (company_name, enable_live, max_pages) for
+    SEARCH_CACHE_TTL seconds; callers get their own copy. Live searches whose
+    crawls all failed are not memoized, so the next call retries them.
     """
-    entry = DEFAULT_MOCK.get(company_name, {"partnerships": [], "urls": []})
+    key = (company_name, enable_live, max_pages)
+    now = time.monotonic()
+    with _SEARCH_LOCK:
+        hit = _SEARCH_CACHE.get(key)
+    if hit is not None and now - hit[0] < SEARCH_CACHE_TTL:
+        return copy.deepcopy(hit[1])
+
+    result = _search(company_name, enable_live=enable_live, max_pages=max_pages)
+    if enable_live and not result["combined_text"]:
+        return result
+    with _SEARCH_LOCK:
+        _SEARCH_CACHE[key] = (now, result)
+        while len(_SEARCH_CACHE) > _SEARCH_CACHE_MAXSIZE:
+            _SEARCH_CACHE.pop(next(iter(_SEARCH_CACHE)))
+    return copy.deepcopy(result)
+
+
+def _search(company_name: str, enable_live: bool, max_pages: int) -> Dict[str, Any]:
+    entry = _MOCK_LOOKUP.get(
+        (company_name or "").strip().casefold(), {"partnerships": [], "urls": []}
+    )
 
     urls = list(entry.get("urls", []))
     partnerships = list(entry.get("partnerships", []))
@@ -38,8 +124,8 @@ def mock_web_search(
     combined_text_parts: List[str] = []
 
     if enable_live and urls:
-        for url in urls[:max_pages]:
-            text = crawl_url(url)
+        pages = urls[:max_pages]
+        for url, text in zip(pages, crawl_urls(pages)):
             if text:
                 combined_text_parts.append(f"Source: {url}\n{text}")
 
@@ -51,21 +137,83 @@ def mock_web_search(
     }
 
 
+def crawl_urls(urls: List[str], timeout: int = 12) -> List[str]:
+    """
+    Crawl several URLs concurrently; returns texts in the same order as urls.
+    """
+    if len(urls) <= 1:
+        return [crawl_url(url, timeout=timeout) for url in urls]
+
+    with ThreadPoolExecutor(max_workers=min(len(urls), 8)) as pool:
+        return list(pool.map(lambda url: crawl_url(url, timeout=timeout), urls))
+
+
 def crawl_url(url: str, timeout: int = 12) -> str:
+    """
+    Extracted <p> text of a page, served from a disk cache keyed by URL when
+    CRAWL_CACHE_ENABLED. Entries older than CRAWL_CACHE_MAX_AGE are re-fetched;
+    failures are not cached.
+    """
+    if not CRAWL_CACHE_ENABLED:
+        return _fetch_text(url, timeout=timeout)
+
+    key = cache_key("crawl", url)
+    hit = _CRAWL_CACHE.get(key)
+    if hit and time.time() - hit["fetched_at"] < CRAWL_CACHE_MAX_AGE:
+        return hit["text"]
+
+    text = _fetch_text(url, timeout=timeout)
+    if text:
+        _CRAWL_CACHE.set(key, {"fetched_at": time.time(), "text": text})
+    return text
+
+
+def _fetch_text(url: str, timeout: int = 12) -> str:
     """
     Very simple page crawler:
-    - Downloads HTML
-    - Extracts visible text from <p> tags
+    - Downloads HTML (at most MAX_HTML_BYTES; the text cap is hit long before)
+    - Extracts visible text from <p> tags, stopping once MAX_TEXT_CHARS is reached
     - Removes extra whitespace
     """
     try:
-        r = requests.get(url, timeout=timeout, headers={"User-Agent": "mvp-agent/0.1"})
-        r.raise_for_status()
+        with _SESSION.get(url, timeout=timeout, stream=True) as r:
+            r.raise_for_status()
+            html = _read_capped(r, MAX_HTML_BYTES)
+            # r.encoding defaults to ISO-8859-1 for text/* without a charset,
+            # which would override the page's <meta charset>: trust only an
+            # explicit header charset
+            content_type = r.headers.get("Content-Type", "")
+            encoding = r.encoding if "charset=" in content_type.lower() else None
     except Exception:
         return ""
 
-    soup = BeautifulSoup(r.text, "html.parser")
-    ps = soup.find_all("p")
-    text = "\n".join(p.get_text(" ", strip=True) for p in ps)
-    text = re.sub(r"\s+", " ", text).strip()
-    return text[:12000]
+    # Raw bytes + explicit header charset; without one, bs4 detects the
+    # encoding from <meta charset> / the bytes. No separate decode pass
+    soup = BeautifulSoup(html, _HTML_PARSER, parse_only=_ONLY_P, from_encoding=encoding)
+
+    parts: List[str] = []
+    size = 0
+    for p in soup.find_all("p"):
+        part = p.get_text(" ", strip=True)
+        if not part:
+            # Empty <p> (common in Wikipedia infobox markup)
+            continue
+        parts.append(part)
+        size += len(part) + 1
+        if size > MAX_TEXT_CHARS:
+            break
+
+    # str.split() collapses any whitespace run in C; cheaper than a regex sub
+    text = " ".join(" ".join(parts).split())
+    return text[:MAX_TEXT_CHARS]
+
+
+def _read_capped(r: requests.Response, limit: int) -> bytes:
+    chunks: List[bytes] = []
+    size = 0
+    for chunk in r.iter_content(chunk_size=64 * 1024):
+        chunks.append(chunk)
+        size += len(chunk)
+        if size >= limit:
+            break
+    return b"".join(chunks)[:limit]